@@ -0,0 +1,35 @@
+import math
+
+import pandas as pd
+
+from tradingagents.graph.backtest import realized_returns
+
+
+def prices_frame(closes):
+    dates = pd.bdate_range("2024-01-01", periods=len(closes)).strftime("%Y-%m-%d")
+    return pd.DataFrame({"Date": list(dates), "Close": closes})
+
+
+def test_realized_returns():
+    prices = prices_frame([100.0, 110.0, 121.0, 133.1])
+    # 2023-12-30 is a Saturday, entered on the next trading day
+    returns = realized_returns(prices, ["2023-12-30", "2024-01-02", "2024-01-03"], 2)
+
+    assert list(returns["entry_date"]) == ["2024-01-01", "2024-01-02", None]
+    assert list(returns["exit_date"]) == ["2024-01-03", "2024-01-04", None]
+    assert math.isclose(returns["realized_return"][0], 0.21)
+    assert math.isclose(returns["realized_return"][1], 0.21)
+    # the exit is beyond the price history
+    assert math.isnan(returns["realized_return"][2])
+
+
+def test_realized_returns_without_price_history():
+    prices = pd.DataFrame(
+        {"Date": pd.Series(dtype=str), "Close": pd.Series(dtype=float)}
+    )
+    returns = realized_returns(prices, ["2024-01-01", "2024-01-02"], 5)
+
+    assert list(returns["trade_date"]) == ["2024-01-01", "2024-01-02"]
+    assert list(returns["entry_date"]) == [None, None]
+    assert list(returns["exit_date"]) == [None, None]
+    assert returns["realized_return"].isna().all()
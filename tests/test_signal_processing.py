@@ -0,0 +1,40 @@
+import pytest
+
+from tradingagents.graph.signal_processing import parse_decision
+
+
+@pytest.mark.parametrize(
+    "signal, expected",
+    [
+        # the proposal marker decides, the last one wins
+        ("Analysis ... FINAL TRANSACTION PROPOSAL: **BUY**", "BUY"),
+        (
+            "FINAL TRANSACTION PROPOSAL: BUY. Revised: FINAL TRANSACTION PROPOSAL: SELL",
+            "SELL",
+        ),
+        ("Final transaction proposal: `hold`", "HOLD"),
+        # the BUY/HOLD/SELL template placeholder is not a decision
+        ("FINAL TRANSACTION PROPOSAL: **BUY/HOLD/SELL**", None),
+        # a single verdict phrasing with nothing weighed after it
+        ("After weighing both sides, my recommendation: SELL.", "SELL"),
+        ("We strongly recommend a HOLD until earnings.", "HOLD"),
+        ("Final decision is **Buy**", "BUY"),
+        (
+            "The decision to sell now would be premature; we recommend a hold.",
+            "HOLD",
+        ),
+        # options mentioned, not decided
+        ("The risky analyst wants a **BUY** but I settle on Hold.", None),
+        ("The decision to sell now would be premature.", None),
+        # a decision mentioned after the verdict
+        ("I recommend BUY, although a SELL is defensible.", None),
+        # several verdict phrasings
+        ("Recommendation: BUY. On reflection, we recommend HOLD.", None),
+        ("Recommendation: BUY. We recommend BUY.", None),
+        # no decision at all
+        ("The outlook is mixed and more data is needed.", None),
+        ("", None),
+    ],
+)
+def test_parse_decision(signal, expected):
+    assert parse_decision(signal) == expected
@@ -1,6 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
 def create_fundamentals_analyst(llm, toolkit):
@@ -49,7 +50,7 @@ def create_fundamentals_analyst(llm, toolkit):
 
         chain = prompt | llm.bind_tools(tools)
 
-        result = chain.invoke(state["messages"])
+        result = yield chain, state["messages"]
 
         report = ""
 
@@ -61,4 +62,4 @@ def create_fundamentals_analyst(llm, toolkit):
             "fundamentals_report": report,
         }
 
-    return fundamentals_analyst_node
+    return create_llm_node(fundamentals_analyst_node)
@@ -1,9 +1,10 @@
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
-def create_research_manager(llm, memory):
-    def research_manager_node(state) -> dict:
+def create_research_manager(llm, memory, context_builder=None):
+    def research_manager_node(state):
         history = state["investment_debate_state"].get("history", "")
         market_research_report = state["market_report"]
         sentiment_report = state["sentiment_report"]
@@ -19,6 +20,12 @@ def create_research_manager(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        history_context = (
+            context_builder.history(history, "research_manager")
+            if context_builder
+            else history
+        )
+
         prompt = f"""As the portfolio manager and debate facilitator, your role is to critically evaluate this round of debate and make a definitive decision: align with the bear analyst, the bull analyst, or choose Hold only if it is strongly justified based on the arguments presented.
 
 Summarize the key points from both sides concisely, focusing on the most compelling evidence or reasoning. Your recommendation—Buy, Sell, or Hold—must be clear and actionable. Avoid defaulting to Hold simply because both sides have valid points; commit to a stance grounded in the debate's strongest arguments.
@@ -35,8 +42,8 @@ Here are your past reflections on mistakes:
 
 Here is the debate:
 Debate History:
-{history}"""
-        response = llm.invoke(prompt)
+{history_context}"""
+        response = yield llm, prompt
 
         new_investment_debate_state = {
             "judge_decision": response.content,
@@ -52,4 +59,4 @@ Debate History:
             "investment_plan": response.content,
         }
 
-    return research_manager_node
+    return create_llm_node(research_manager_node, blocking=True)
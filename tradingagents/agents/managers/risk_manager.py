@@ -1,9 +1,10 @@
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
-def create_risk_manager(llm, memory):
-    def risk_manager_node(state) -> dict:
+def create_risk_manager(llm, memory, context_builder=None):
+    def risk_manager_node(state):
 
         company_name = state["company_of_interest"]
 
@@ -11,7 +12,7 @@ def create_risk_manager(llm, memory):
         risk_debate_state = state["risk_debate_state"]
         market_research_report = state["market_report"]
         news_report = state["news_report"]
-        fundamentals_report = state["news_report"]
+        fundamentals_report = state["fundamentals_report"]
         sentiment_report = state["sentiment_report"]
         trader_plan = state["investment_plan"]
 
@@ -22,6 +23,12 @@ def create_risk_manager(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        history_context = (
+            context_builder.history(history, "risk_manager")
+            if context_builder
+            else history
+        )
+
         prompt = f"""As the Risk Management Judge and Debate Facilitator, your goal is to evaluate the debate between three risk analysts—Risky, Neutral, and Safe/Conservative—and determine the best course of action for the trader. Your decision must result in a clear recommendation: Buy, Sell, or Hold. Choose Hold only if strongly justified by specific arguments, not as a fallback when all sides seem valid. Strive for clarity and decisiveness.
 
 Guidelines for Decision-Making:
@@ -37,13 +44,13 @@ Deliverables:
 ---
 
 **Analysts Debate History:**  
-{history}
+{history_context}
 
 ---
 
 Focus on actionable insights and continuous improvement. Build on past lessons, critically evaluate all perspectives, and ensure each decision advances better outcomes."""
 
-        response = llm.invoke(prompt)
+        response = yield llm, prompt
 
         new_risk_debate_state = {
             "judge_decision": response.content,
@@ -63,4 +70,4 @@ Focus on actionable insights and continuous improvement. Build on past lessons,
             "final_trade_decision": response.content,
         }
 
-    return risk_manager_node
+    return create_llm_node(risk_manager_node, blocking=True)
@@ -1,10 +1,11 @@
 from langchain_core.messages import AIMessage
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
-def create_bear_researcher(llm, memory):
-    def bear_node(state) -> dict:
+def create_bear_researcher(llm, memory, context_builder=None):
+    def bear_node(state):
         investment_debate_state = state["investment_debate_state"]
         history = investment_debate_state.get("history", "")
         bear_history = investment_debate_state.get("bear_history", "")
@@ -29,6 +30,10 @@ def create_bear_researcher(llm, memory):
             print(f"Warning: Could not retrieve past memories: {str(e)}")
             past_memory_str = "No past memories available."
 
+        history_context = (
+            context_builder.history(history, "bear") if context_builder else history
+        )
+
         prompt = f"""You are a Bear Analyst making the case against investing in the stock. Your goal is to present a well-reasoned argument emphasizing risks, challenges, and negative indicators. Leverage the provided research and data to highlight potential downsides and counter bullish arguments effectively.
 
 Key points to focus on:
@@ -45,13 +50,13 @@ Market research report: {market_research_report}
 Social media sentiment report: {sentiment_report}
 Latest world affairs news: {news_report}
 Company fundamentals report: {fundamentals_report}
-Conversation history of the debate: {history}
+Conversation history of the debate: {history_context}
 Last bull argument: {current_response}
 Reflections from similar situations and lessons learned: {past_memory_str}
 Use this information to deliver a compelling bear argument, refute the bull's claims, and engage in a dynamic debate that demonstrates the risks and weaknesses of investing in the stock. You must also address reflections and learn from lessons and mistakes you made in the past.
 """
 
-        response = llm.invoke(prompt)
+        response = yield llm, prompt
 
         argument = f"Bear Analyst: {response.content}"
 
@@ -65,4 +70,4 @@ Use this information to deliver a compelling bear argument, refute the bull's cl
 
         return {"investment_debate_state": new_investment_debate_state}
 
-    return bear_node
+    return create_llm_node(bear_node, blocking=True)
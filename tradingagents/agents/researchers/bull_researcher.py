@@ -1,10 +1,11 @@
 from langchain_core.messages import AIMessage
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
-def create_bull_researcher(llm, memory):
-    def bull_node(state) -> dict:
+def create_bull_researcher(llm, memory, context_builder=None):
+    def bull_node(state):
         investment_debate_state = state["investment_debate_state"]
         history = investment_debate_state.get("history", "")
         bull_history = investment_debate_state.get("bull_history", "")
@@ -29,6 +30,10 @@ def create_bull_researcher(llm, memory):
             print(f"Warning: Could not retrieve past memories: {str(e)}")
             past_memory_str = "No past memories available."
 
+        history_context = (
+            context_builder.history(history, "bull") if context_builder else history
+        )
+
         prompt = f"""You are a Bull Analyst advocating for investing in the stock. Your task is to build a strong, evidence-based case emphasizing growth potential, competitive advantages, and positive market indicators. Leverage the provided research and data to address concerns and counter bearish arguments effectively.
 
 Key points to focus on:
@@ -43,13 +48,13 @@ Market research report: {market_research_report}
 Social media sentiment report: {sentiment_report}
 Latest world affairs news: {news_report}
 Company fundamentals report: {fundamentals_report}
-Conversation history of the debate: {history}
+Conversation history of the debate: {history_context}
 Last bear argument: {current_response}
 Reflections from similar situations and lessons learned: {past_memory_str}
 Use this information to deliver a compelling bull argument, refute the bear's concerns, and engage in a dynamic debate that demonstrates the strengths of the bull position. You must also address reflections and learn from lessons and mistakes you made in the past.
 """
 
-        response = llm.invoke(prompt)
+        response = yield llm, prompt
 
         argument = f"Bull Analyst: {response.content}"
 
@@ -63,4 +68,4 @@ Use this information to deliver a compelling bull argument, refute the bear's co
 
         return {"investment_debate_state": new_investment_debate_state}
 
-    return bull_node
+    return create_llm_node(bull_node, blocking=True)
@@ -1,9 +1,10 @@
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
-def create_risky_debator(llm):
-    def risky_node(state) -> dict:
+def create_risky_debator(llm, context_builder=None):
+    def risky_node(state):
         risk_debate_state = state["risk_debate_state"]
         history = risk_debate_state.get("history", "")
         risky_history = risk_debate_state.get("risky_history", "")
@@ -18,6 +19,10 @@ def create_risky_debator(llm):
 
         trader_decision = state["trader_investment_plan"]
 
+        history_context = (
+            context_builder.history(history, "risky") if context_builder else history
+        )
+
         prompt = f"""As the Risky Risk Analyst, your role is to actively champion high-reward, high-risk opportunities, emphasizing bold strategies and competitive advantages. When evaluating the trader's decision or plan, focus intently on the potential upside, growth potential, and innovative benefits—even when these come with elevated risk. Use the provided market data and sentiment analysis to strengthen your arguments and challenge the opposing views. Specifically, respond directly to each point made by the conservative and neutral analysts, countering with data-driven rebuttals and persuasive reasoning. Highlight where their caution might miss critical opportunities or where their assumptions may be overly conservative. Here is the trader's decision:
 
 {trader_decision}
@@ -28,11 +33,11 @@ Market Research Report: {market_research_report}
 Social Media Sentiment Report: {sentiment_report}
 Latest World Affairs Report: {news_report}
 Company Fundamentals Report: {fundamentals_report}
-Here is the current conversation history: {history} Here are the last arguments from the conservative analyst: {current_safe_response} Here are the last arguments from the neutral analyst: {current_neutral_response}. If there are no responses from the other viewpoints, do not halluncinate and just present your point.
+Here is the current conversation history: {history_context} Here are the last arguments from the conservative analyst: {current_safe_response} Here are the last arguments from the neutral analyst: {current_neutral_response}. If there are no responses from the other viewpoints, do not halluncinate and just present your point.
 
 Engage actively by addressing any specific concerns raised, refuting the weaknesses in their logic, and asserting the benefits of risk-taking to outpace market norms. Maintain a focus on debating and persuading, not just presenting data. Challenge each counterpoint to underscore why a high-risk approach is optimal. Output conversationally as if you are speaking without any special formatting."""
 
-        response = llm.invoke(prompt)
+        response = yield llm, prompt
 
         argument = f"Risky Analyst: {response.content}"
 
@@ -52,4 +57,4 @@ Engage actively by addressing any specific concerns raised, refuting the weaknes
 
         return {"risk_debate_state": new_risk_debate_state}
 
-    return risky_node
+    return create_llm_node(risky_node)
@@ -1,9 +1,10 @@
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
-def create_neutral_debator(llm):
-    def neutral_node(state) -> dict:
+def create_neutral_debator(llm, context_builder=None):
+    def neutral_node(state):
         risk_debate_state = state["risk_debate_state"]
         history = risk_debate_state.get("history", "")
         neutral_history = risk_debate_state.get("neutral_history", "")
@@ -18,6 +19,10 @@ def create_neutral_debator(llm):
 
         trader_decision = state["trader_investment_plan"]
 
+        history_context = (
+            context_builder.history(history, "neutral") if context_builder else history
+        )
+
         prompt = f"""As the Neutral Risk Analyst, your role is to provide a balanced perspective, weighing both the potential benefits and risks of the trader's decision or plan. You prioritize a well-rounded approach, evaluating the upsides and downsides while factoring in broader market trends, potential economic shifts, and diversification strategies.Here is the trader's decision:
 
 {trader_decision}
@@ -28,11 +33,11 @@ Market Research Report: {market_research_report}
 Social Media Sentiment Report: {sentiment_report}
 Latest World Affairs Report: {news_report}
 Company Fundamentals Report: {fundamentals_report}
-Here is the current conversation history: {history} Here is the last response from the risky analyst: {current_risky_response} Here is the last response from the safe analyst: {current_safe_response}. If there are no responses from the other viewpoints, do not halluncinate and just present your point.
+Here is the current conversation history: {history_context} Here is the last response from the risky analyst: {current_risky_response} Here is the last response from the safe analyst: {current_safe_response}. If there are no responses from the other viewpoints, do not halluncinate and just present your point.
 
 Engage actively by analyzing both sides critically, addressing weaknesses in the risky and conservative arguments to advocate for a more balanced approach. Challenge each of their points to illustrate why a moderate risk strategy might offer the best of both worlds, providing growth potential while safeguarding against extreme volatility. Focus on debating rather than simply presenting data, aiming to show that a balanced view can lead to the most reliable outcomes. Output conversationally as if you are speaking without any special formatting."""
 
-        response = llm.invoke(prompt)
+        response = yield llm, prompt
 
         argument = f"Neutral Analyst: {response.content}"
 
@@ -52,4 +57,4 @@ Engage actively by analyzing both sides critically, addressing weaknesses in the
 
         return {"risk_debate_state": new_risk_debate_state}
 
-    return neutral_node
+    return create_llm_node(neutral_node)
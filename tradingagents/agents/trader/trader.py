@@ -1,6 +1,7 @@
 import functools
 import time
 import json
+from tradingagents.agents.utils.agent_utils import create_llm_node
 
 
 def create_trader(llm, memory):
@@ -35,7 +36,7 @@ def create_trader(llm, memory):
             context,
         ]
 
-        result = llm.invoke(messages)
+        result = yield llm, messages
 
         return {
             "messages": [result],
@@ -43,4 +44,6 @@ def create_trader(llm, memory):
             "sender": name,
         }
 
-    return functools.partial(trader_node, name="Trader")
+    return create_llm_node(
+        functools.partial(trader_node, name="Trader"), blocking=True, name="trader_node"
+    )
@@ -5,6 +5,8 @@ from langchain_openai import ChatOpenAI
 from tradingagents.agents import *
 from langgraph.prebuilt import ToolNode
 from langgraph.graph import END, StateGraph, START, MessagesState
+from langgraph.graph.message import add_messages
+from langchain_core.messages import AnyMessage
 
 
 # Researcher team state
@@ -74,3 +76,9 @@ class AgentState(MessagesState):
         RiskDebateState, "Current state of the debate on evaluating risk"
     ]
     final_trade_decision: Annotated[str, "Final decision made by the Risk Analysts"]
+
+    # separate message channels of the analysts when they run in parallel
+    market_messages: Annotated[list[AnyMessage], add_messages]
+    social_messages: Annotated[list[AnyMessage], add_messages]
+    news_messages: Annotated[list[AnyMessage], add_messages]
+    fundamentals_messages: Annotated[list[AnyMessage], add_messages]
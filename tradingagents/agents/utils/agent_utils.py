@@ -4,7 +4,9 @@ from typing import Annotated
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import RemoveMessage
 from langchain_core.tools import tool
+from langchain_core.runnables import RunnableLambda
 from datetime import date, timedelta, datetime
+import asyncio
 import functools
 import pandas as pd
 import os
@@ -31,6 +33,52 @@ def create_msg_delete():
     return delete_messages
 
 
+def create_llm_node(node_steps, blocking=False, name=None):
+    """
+    Turn an agent node written as a generator into a graph node that can run both
+    synchronously and on an event loop. The generator yields (runnable, input) for
+    each LLM call, receives the response and finally returns the state update.
+    The sync path calls runnable.invoke, the async path awaits runnable.ainvoke.
+    blocking marks nodes whose steps do blocking work (e.g. memory lookups), which
+    the async path runs in a worker thread.
+    """
+
+    def node(state):
+        steps = node_steps(state)
+        response = None
+        while True:
+            done, value = _next_step(steps, response)
+            if done:
+                return value
+            runnable, llm_input = value
+            response = runnable.invoke(llm_input)
+
+    async def anode(state):
+        steps = node_steps(state)
+        response = None
+        while True:
+            if blocking:
+                done, value = await asyncio.to_thread(_next_step, steps, response)
+            else:
+                done, value = _next_step(steps, response)
+            if done:
+                return value
+            runnable, llm_input = value
+            response = await runnable.ainvoke(llm_input)
+
+    return RunnableLambda(
+        node, afunc=anode, name=name or getattr(node_steps, "__name__", None)
+    )
+
+
+def _next_step(steps, response):
+    # StopIteration cannot cross a future, so report the end of the node as a flag
+    try:
+        return False, steps.send(response)
+    except StopIteration as stop:
+        return True, stop.value
+
+
 class Toolkit:
     _config = DEFAULT_CONFIG.copy()
 
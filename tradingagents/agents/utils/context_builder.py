@@ -0,0 +1,156 @@
+import re
+import threading
+
+# speaker prefixes the researchers and risk debators put on their turns
+SPEAKER_MARKERS = [
+    "Bull Analyst:",
+    "Bear Analyst:",
+    "Risky Analyst:",
+    "Safe Analyst:",
+    "Neutral Analyst:",
+]
+
+_TURN_START = re.compile(
+    r"^(?=(?:" + "|".join(re.escape(marker) for marker in SPEAKER_MARKERS) + r"))",
+    re.MULTILINE,
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_TRUNCATION_SUFFIX = " ..."
+
+# tokens kept free for the omission and summary headers and the separators
+_HEADER_TOKENS = 24
+
+
+class ContextBuilder:
+    """
+    Fits a debate history into a per-role token budget.
+
+    The history is split into turns on the speaker markers. The most recent
+    turns are kept verbatim; older turns are reduced to their speaker and first
+    sentences, and the oldest are dropped if that is still over budget. The
+    prompt a debater or manager sends therefore stops growing with the number of
+    debate rounds. Tokens are counted with tiktoken when its encoding is
+    available, and estimated as characters / 4 otherwise.
+    """
+
+    def __init__(
+        self,
+        budgets=None,
+        recent_turns=3,
+        summary_sentences=2,
+        encoding_name="cl100k_base",
+    ):
+        """Initialize with the history budget in tokens of each role (None or a
+        missing role is unlimited), the number of turns kept verbatim and the
+        number of sentences kept of each older turn."""
+        self.budgets = budgets or {}
+        self.recent_turns = recent_turns
+        self.summary_sentences = summary_sentences
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._encoding_loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        """The tiktoken encoding, or None when tiktoken or its data is unavailable."""
+        with self._lock:
+            if not self._encoding_loaded:
+                self._encoding_loaded = True
+                try:
+                    import tiktoken
+
+                    self._encoding = tiktoken.get_encoding(self.encoding_name)
+                except Exception:
+                    # not installed, or the encoding cannot be downloaded
+                    self._encoding = None
+            return self._encoding
+
+    def count_tokens(self, text):
+        if self.encoding is None:
+            return (len(text) + 3) // 4
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text, max_tokens):
+        """Keep the start of text, with a " ..." suffix, in max_tokens tokens."""
+        if self.count_tokens(text) <= max_tokens:
+            return text
+
+        kept_tokens = max_tokens - self.count_tokens(_TRUNCATION_SUFFIX)
+        while kept_tokens > 0:
+            if self.encoding is None:
+                head = text[: kept_tokens * 4]
+            else:
+                tokens = self.encoding.encode(text, disallowed_special=())
+                head = self.encoding.decode(tokens[:kept_tokens])
+            truncated = head.rstrip() + _TRUNCATION_SUFFIX
+            # re-tokenizing at the cut can cost a token more than counted
+            if self.count_tokens(truncated) <= max_tokens:
+                return truncated
+            kept_tokens -= 1
+        return ""
+
+    @staticmethod
+    def split_turns(history):
+        """Split a debate history into its turns, each starting with a speaker marker."""
+        return [turn.strip() for turn in _TURN_START.split(history) if turn.strip()]
+
+    def summarize_turn(self, turn):
+        """Extractive summary of a turn: its speaker and first sentences."""
+        speaker, _, text = turn.partition(":")
+        if f"{speaker}:" not in SPEAKER_MARKERS:
+            speaker, text = "", turn
+        sentences = _SENTENCE_END.split(" ".join(text.split()))
+        summary = " ".join(sentences[: self.summary_sentences])
+        if len(sentences) > self.summary_sentences:
+            summary += " ..."
+        return f"{speaker}: {summary}" if speaker else summary
+
+    def history(self, history, role):
+        """The debate history fitted to the budget of role."""
+        budget = self.budgets.get(role)
+        if budget is None or self.count_tokens(history) <= budget:
+            return history
+
+        turns = self.split_turns(history)
+        recent = turns[-self.recent_turns :] if self.recent_turns else []
+        older = [
+            self.summarize_turn(turn) for turn in turns[: len(turns) - len(recent)]
+        ]
+
+        # recent turns come first, the latest above all: the older recent turns
+        # are cut (down to nothing) before the latest one is
+        budget_left = budget - _HEADER_TOKENS
+        recent_tokens = [self.count_tokens(turn) for turn in recent]
+        for i in range(len(recent)):
+            excess = sum(recent_tokens) - budget_left
+            if excess <= 0:
+                break
+            recent[i] = self.truncate(recent[i], max(recent_tokens[i] - excess, 0))
+            recent_tokens[i] = self.count_tokens(recent[i])
+        recent = [turn for turn in recent if turn]
+
+        remaining = budget_left - sum(recent_tokens)
+        kept = []
+        for turn in reversed(older):
+            tokens = self.count_tokens(turn)
+            if tokens > remaining:
+                break
+            kept.insert(0, turn)
+            remaining -= tokens
+
+        fitted = self._join(older, kept, recent)
+        while kept and self.count_tokens(fitted) > budget:
+            kept.pop(0)
+            fitted = self._join(older, kept, recent)
+        return fitted
+
+    @staticmethod
+    def _join(older, kept, recent):
+        parts = []
+        if len(kept) < len(older):
+            parts.append(f"[{len(older) - len(kept)} earlier turns omitted]")
+        if kept:
+            parts.append("Summary of earlier turns:\n" + "\n".join(kept))
+        parts.extend(recent)
+        return "\n" + "\n".join(parts)
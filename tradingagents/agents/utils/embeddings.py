@@ -0,0 +1,73 @@
+import re
+import zlib
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9$%.]*[a-z0-9%]")
+
+
+class HashingEmbedder:
+    """
+    Offline embedding backend: feature-hashed word n-grams.
+
+    Every word n-gram of a text is hashed with crc32 into one of dim buckets, with
+    a sign taken from another bit of the hash so collisions cancel out on average.
+    The bucket counts are accumulated for a whole batch of texts with a single
+    np.bincount and each row is L2-normalized, so texts sharing vocabulary end up
+    close in cosine distance without any network call.
+    """
+
+    def __init__(self, dim=384, ngrams=2):
+        self.dim = dim
+        self.ngrams = ngrams
+
+    @property
+    def name(self):
+        """Identifies the embedding space, e.g. for caching embeddings."""
+        return f"hashing-{self.dim}-{self.ngrams}"
+
+    def features(self, text):
+        """Word n-grams (1 to ngrams words) of a text."""
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = list(tokens)
+        for n in range(2, self.ngrams + 1):
+            features.extend(
+                " ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1)
+            )
+        return features
+
+    def embed(self, texts):
+        """Embed a batch of texts into an (n, dim) float32 array of unit rows."""
+        texts = list(texts)
+        text_features = [self.features(text) for text in texts]
+        counts = np.array(
+            [len(features) for features in text_features], dtype=np.int64
+        )
+        rows = np.repeat(np.arange(len(texts)), counts)
+        flat = [feature for features in text_features for feature in features]
+
+        # hash every distinct feature of the batch once
+        feature_ids = {}
+        inverse = np.fromiter(
+            (feature_ids.setdefault(feature, len(feature_ids)) for feature in flat),
+            dtype=np.int64,
+            count=len(flat),
+        )
+        hashes = np.fromiter(
+            (zlib.crc32(feature.encode()) for feature in feature_ids),
+            dtype=np.uint64,
+            count=len(feature_ids),
+        )[inverse]
+
+        buckets = (hashes % self.dim).astype(np.int64)
+        signs = np.where((hashes >> np.uint64(31)) & np.uint64(1), -1.0, 1.0)
+
+        vectors = np.bincount(
+            rows * self.dim + buckets,
+            weights=signs,
+            minlength=len(texts) * self.dim,
+        ).reshape(len(texts), self.dim).astype(np.float32)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
@@ -1,12 +1,64 @@
 import chromadb
 from chromadb.config import Settings
 import hashlib
+import os
+import threading
+import uuid
 import numpy as np
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .embeddings import HashingEmbedder
+from .vector_store import NumpyVectorStore
+
+# chroma: chromadb collections
+# numpy: NumpyVectorStore, an in-process float32 matrix
+MEMORY_BACKENDS = ["chroma", "numpy"]
+
+# age: evict the oldest situations
+# usefulness: evict the least retrieved situations, the oldest among equals
+MEMORY_EVICTION_POLICIES = ["age", "usefulness"]
+
+
+class EmbeddingMemo:
+    """LRU memo of embeddings keyed by (embedding model, sha256 of the text), shared
+    by the memories of a graph so a situation is only embedded once per run."""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._embeddings = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model, text):
+        return (model, hashlib.sha256(text.encode()).hexdigest())
+
+    def get(self, key):
+        with self._lock:
+            embedding = self._embeddings.get(key)
+            if embedding is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._embeddings.move_to_end(key)
+            return embedding
+
+    def put(self, key, embedding):
+        with self._lock:
+            self._embeddings[key] = embedding
+            self._embeddings.move_to_end(key)
+            while len(self._embeddings) > self.max_size:
+                self._embeddings.popitem(last=False)
 
 
 class FinancialSituationMemory:
-    def __init__(self, name, config):
+    def __init__(self, name, config, embedding_memo=None):
         self.config = config
+        self.embedding_memo = embedding_memo
+        self.hash_embedder = HashingEmbedder(
+            dim=config["hash_embedding_dim"], ngrams=config["hash_embedding_ngrams"]
+        )
         self.use_embeddings = False
         
         # Only use embeddings if OpenAI or local Ollama backend
@@ -27,90 +79,319 @@ class FinancialSituationMemory:
             except:
                 self.use_embeddings = False
         else:
-            # For Google/Gemini and other backends, use simple hash-based embeddings
+            # For Google/Gemini and other backends, use local hash-based embeddings
             self.use_embeddings = False
             
-        self.chroma_client = chromadb.Client(Settings(allow_reset=True))
-        self.situation_collection = self.chroma_client.create_collection(name=name)
+        self.name = name
+        if config["memory_eviction"] not in MEMORY_EVICTION_POLICIES:
+            raise ValueError(
+                f"Unknown memory eviction {config['memory_eviction']!r}, expected one of {MEMORY_EVICTION_POLICIES}"
+            )
+        if config["memory_backend"] not in MEMORY_BACKENDS:
+            raise ValueError(
+                f"Unknown memory backend {config['memory_backend']!r}, expected one of {MEMORY_BACKENDS}"
+            )
+        if config["memory_backend"] == "chroma":
+            if config["memory_persist"]:
+                # Stored on disk with a memory-mapped index, so a restarted process
+                # serves the past reflections without re-embedding them
+                self.chroma_client = chromadb.PersistentClient(
+                    path=self.persist_dir(config), settings=Settings(allow_reset=True)
+                )
+            else:
+                self.chroma_client = chromadb.Client(Settings(allow_reset=True))
+        self.situation_collection = self._open_collection()
+
+        # retention state: insertion order, retrievals since the last compaction
+        self._write_lock = threading.Lock()
+        self._hits_lock = threading.Lock()
+        self._pending_hits = Counter()
+        self._adds_since_compaction = 0
+        stored = self.situation_collection.get(include=["metadatas"])["metadatas"]
+        self._next_seq = 1 + max((m.get("seq", 0) for m in stored), default=-1)
+
+    @staticmethod
+    def persist_dir(config):
+        """Directory of the persistent memories: memory_dir, or memory under results_dir"""
+        return config["memory_dir"] or os.path.join(config["results_dir"], "memory")
+
+    @property
+    def embedding_space(self):
+        """Name of the model the situations are embedded with"""
+        return self.embedding if self.use_embeddings else self.hash_embedder.name
+
+    def _open_collection(self):
+        # cosine space, so both backends report the same similarity_score
+        metadata = {
+            "embedding_space": self.embedding_space,
+            "hnsw:space": "cosine",
+        }
+        if self.config["memory_backend"] == "numpy":
+            path = None
+            if self.config["memory_persist"]:
+                path = os.path.join(self.persist_dir(self.config), self.name)
+            collection = NumpyVectorStore(path=path, metadata=metadata)
+        elif self.config["memory_persist"]:
+            collection = self.chroma_client.get_or_create_collection(
+                name=self.name, metadata=metadata
+            )
+        else:
+            return self.chroma_client.create_collection(
+                name=self.name, metadata=metadata
+            )
+
+        stored = collection.metadata or {}
+        stored_space = stored.get("embedding_space")
+        if stored_space != self.embedding_space:
+            raise ValueError(
+                f"Memory {self.name} in {self.persist_dir(self.config)} was embedded with "
+                f"{stored_space}, not {self.embedding_space}. Clear it or use another memory_dir."
+            )
+        if (
+            self.config["memory_backend"] != "numpy"
+            and stored.get("hnsw:space") != "cosine"
+        ):
+            raise ValueError(
+                f"Memory {self.name} in {self.persist_dir(self.config)} uses "
+                f"{stored.get('hnsw:space', 'l2')} distance, not cosine. Clear it or use "
+                "another memory_dir."
+            )
+        return collection
+
+    def clear(self):
+        """Forget all stored situations and advice"""
+        with self._write_lock:
+            if self.config["memory_backend"] == "numpy":
+                self.situation_collection.clear()
+            else:
+                self.chroma_client.delete_collection(self.name)
+                self.situation_collection = self._open_collection()
+            with self._hits_lock:
+                self._pending_hits.clear()
+            self._adds_since_compaction = 0
+            self._next_seq = 0
 
     def get_embedding(self, text):
         """Get embedding for a text - uses OpenAI if available, else simple hash"""
-        if self.use_embeddings:
-            try:
-                response = self.client.embeddings.create(
-                    model=self.embedding, input=text
-                )
-                return response.data[0].embedding
-            except Exception as e:
-                # Fallback to hash-based embedding if API fails
-                return self._get_hash_embedding(text)
-        else:
-            return self._get_hash_embedding(text)
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts):
+        """Get embeddings for several texts, in order.
+
+        Texts are sent to the embeddings endpoint in batches of embedding_batch_size,
+        with up to embedding_concurrency requests in flight.
+        """
+        texts = list(texts)
+        if self.embedding_memo is None:
+            return self._compute_embeddings(texts)
+
+        keys = [EmbeddingMemo.key(self.embedding_space, text) for text in texts]
+        embeddings = [self.embedding_memo.get(key) for key in keys]
+
+        # embed each missing text once, even if it appears several times
+        missing = {}
+        for text, key, embedding in zip(texts, keys, embeddings):
+            if embedding is None:
+                missing.setdefault(key, text)
+        if missing:
+            computed = dict(
+                zip(missing, self._compute_embeddings(list(missing.values())))
+            )
+            for key, embedding in computed.items():
+                self.embedding_memo.put(key, embedding)
+            embeddings = [
+                computed[key] if embedding is None else embedding
+                for key, embedding in zip(keys, embeddings)
+            ]
+        return embeddings
+
+    def _compute_embeddings(self, texts):
+        if not self.use_embeddings:
+            return self._get_hash_embeddings(texts)
+
+        batch_size = self.config["embedding_batch_size"]
+        batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+        if len(batches) <= 1:
+            return [e for batch in batches for e in self._embed_batch(batch)]
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.config["embedding_concurrency"], len(batches))
+        ) as executor:
+            batch_embeddings = list(executor.map(self._embed_batch, batches))
+        return [e for embeddings in batch_embeddings for e in embeddings]
+
+    def _embed_batch(self, texts):
+        try:
+            response = self.client.embeddings.create(
+                model=self.embedding, input=texts
+            )
+            return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+        except Exception as e:
+            # Fallback to hash-based embedding if API fails
+            return self._get_hash_embeddings(texts)
     
     def _get_hash_embedding(self, text):
-        """Create a simple deterministic embedding from text using hashing"""
-        # Create a 384-dimensional embedding (smaller than typical 1536)
-        # This is a simple fallback when real embeddings aren't available
-        text_hash = hashlib.sha256(text.encode()).hexdigest()
-        
-        # Convert hash to numbers
-        embedding = []
-        for i in range(0, min(len(text_hash), 384*2), 2):
-            # Convert hex pairs to float values between -1 and 1
-            hex_val = int(text_hash[i:i+2], 16)
-            normalized = (hex_val / 128.0) - 1.0
-            embedding.append(normalized)
-        
-        # Pad to 384 dimensions if needed
-        while len(embedding) < 384:
-            embedding.append(0.0)
-            
-        return embedding[:384]
+        """Create a deterministic embedding from text using feature hashing"""
+        return self._get_hash_embeddings([text])[0]
+
+    def _get_hash_embeddings(self, texts):
+        """Embed a batch of texts offline with the hashing embedder"""
+        return list(self.hash_embedder.embed(texts))
 
     def add_situations(self, situations_and_advice):
-        """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)"""
-
-        situations = []
-        advice = []
-        ids = []
-        embeddings = []
-
-        offset = self.situation_collection.count()
-
-        for i, (situation, recommendation) in enumerate(situations_and_advice):
-            situations.append(situation)
-            advice.append(recommendation)
-            ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
-
-        self.situation_collection.add(
-            documents=situations,
-            metadatas=[{"recommendation": rec} for rec in advice],
-            embeddings=embeddings,
-            ids=ids,
+        """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)
+
+        A situation within memory_merge_threshold cosine similarity of a stored one
+        replaces it, keeping its retrieval count. Every memory_compact_every calls
+        the memory is compacted down to memory_max_size.
+        """
+        situations = [situation for situation, _ in situations_and_advice]
+        advice = [recommendation for _, recommendation in situations_and_advice]
+        if not situations:
+            return
+        embeddings = self.get_embeddings(situations)
+
+        with self._write_lock:
+            merged = self._merge_near_duplicates(situations, advice, embeddings)
+            new = [i for i in range(len(situations)) if i not in merged]
+            if new:
+                self.situation_collection.add(
+                    documents=[situations[i] for i in new],
+                    metadatas=[
+                        {
+                            "recommendation": advice[i],
+                            "seq": self._take_seq(),
+                            "hits": 0,
+                        }
+                        for i in new
+                    ],
+                    embeddings=[embeddings[i] for i in new],
+                    ids=[uuid.uuid4().hex for _ in new],
+                )
+
+            self._adds_since_compaction += 1
+            if self._adds_since_compaction >= self.config["memory_compact_every"]:
+                self._compact()
+
+    def _take_seq(self):
+        seq = self._next_seq
+        self._next_seq += 1
+        return seq
+
+    def _merge_near_duplicates(self, situations, advice, embeddings):
+        """Update the stored near-duplicates of new situations in place, returns the
+        indices of the merged situations."""
+        threshold = self.config["memory_merge_threshold"]
+        if threshold is None or self.situation_collection.count() == 0:
+            return set()
+
+        results = self.situation_collection.query(
+            query_embeddings=embeddings,
+            n_results=1,
+            include=["metadatas", "embeddings"],
         )
+        # stored id -> (index of the newest situation merged into it, its metadata);
+        # older situations of the batch merged into the same one are dropped
+        merged = {}
+        merged_indices = set()
+        for i, embedding in enumerate(embeddings):
+            if not results["ids"][i]:
+                continue
+            stored = np.asarray(results["embeddings"][i][0], dtype=np.float32)
+            embedding = np.asarray(embedding, dtype=np.float32)
+            norms = np.linalg.norm(stored) * np.linalg.norm(embedding)
+            if norms > 0 and float(stored @ embedding) / norms >= threshold:
+                merged[results["ids"][i][0]] = (i, results["metadatas"][i][0])
+                merged_indices.add(i)
+
+        if merged:
+            ids = list(merged)
+            self.situation_collection.update(
+                ids=ids,
+                documents=[situations[merged[id_][0]] for id_ in ids],
+                embeddings=[embeddings[merged[id_][0]] for id_ in ids],
+                metadatas=[
+                    {
+                        "recommendation": advice[merged[id_][0]],
+                        "seq": self._take_seq(),
+                        "hits": merged[id_][1].get("hits", 0),
+                        "merges": merged[id_][1].get("merges", 0) + 1,
+                    }
+                    for id_ in ids
+                ],
+            )
+        return merged_indices
+
+    def compact(self):
+        """Record the pending retrieval counts and evict down to memory_max_size."""
+        with self._write_lock:
+            self._compact()
+
+    def _compact(self):
+        self._adds_since_compaction = 0
+        with self._hits_lock:
+            pending_hits, self._pending_hits = self._pending_hits, Counter()
+
+        stored = self.situation_collection.get(include=["metadatas"])
+        metadatas = dict(zip(stored["ids"], stored["metadatas"]))
+        hit_ids = [id_ for id_ in pending_hits if id_ in metadatas]
+        for id_ in hit_ids:
+            metadatas[id_] = {
+                **metadatas[id_],
+                "hits": metadatas[id_].get("hits", 0) + pending_hits[id_],
+            }
+        if hit_ids:
+            self.situation_collection.update(
+                ids=hit_ids, metadatas=[metadatas[id_] for id_ in hit_ids]
+            )
+
+        max_size = self.config["memory_max_size"]
+        if max_size is None or len(metadatas) <= max_size:
+            return
+        def eviction_order(id_):
+            age = metadatas[id_].get("seq", 0)
+            if self.config["memory_eviction"] == "usefulness":
+                return (metadatas[id_].get("hits", 0), age)
+            return age
+
+        evicted = sorted(metadatas, key=eviction_order)[: len(metadatas) - max_size]
+        self.situation_collection.delete(ids=evicted)
 
     def get_memories(self, current_situation, n_matches=1):
         """Find matching recommendations using OpenAI embeddings"""
-        query_embedding = self.get_embedding(current_situation)
+        return self.get_memories_many([current_situation], n_matches)[0]
+
+    def get_memories_many(self, current_situations, n_matches=1):
+        """Find matching recommendations for several situations with one embedding
+        round-trip and one query. Returns one list of matches per situation."""
+        query_embeddings = self.get_embeddings(current_situations)
+        if not query_embeddings:
+            return []
 
         results = self.situation_collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=n_matches,
             include=["metadatas", "documents", "distances"],
         )
 
-        matched_results = []
-        for i in range(len(results["documents"][0])):
-            matched_results.append(
-                {
-                    "matched_situation": results["documents"][0][i],
-                    "recommendation": results["metadatas"][0][i]["recommendation"],
-                    "similarity_score": 1 - results["distances"][0][i],
-                }
-            )
+        with self._hits_lock:
+            for ids in results["ids"]:
+                self._pending_hits.update(ids)
+
+        all_matches = []
+        for q in range(len(query_embeddings)):
+            matched_results = []
+            for i in range(len(results["documents"][q])):
+                matched_results.append(
+                    {
+                        "matched_situation": results["documents"][q][i],
+                        "recommendation": results["metadatas"][q][i]["recommendation"],
+                        "similarity_score": 1 - results["distances"][q][i],
+                    }
+                )
+            all_matches.append(matched_results)
 
-        return matched_results
+        return all_matches
 
 
 if __name__ == "__main__":
@@ -0,0 +1,268 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+_EMBEDDINGS_FILE = "embeddings.npy"
+_RECORDS_FILE = "records.json"
+
+
+def _unit_rows(embeddings):
+    rows = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    return np.divide(rows, norms, out=np.zeros_like(rows), where=norms > 0)
+
+
+class NumpyVectorStore:
+    """
+    In-process vector index over a contiguous float32 matrix.
+
+    Embeddings are L2-normalized on insert into a preallocated matrix whose
+    capacity doubles when full, so appends are amortized O(1) and a query is a
+    single matrix product followed by np.argpartition for the top k. Implements
+    the part of the Chroma collection API FinancialSituationMemory uses (count,
+    add, query, get, update, delete, metadata); distances are cosine distances.
+    Deleting rows rebuilds a tight matrix, so queries only ever scan live rows.
+
+    With a path, the store is loaded from and saved to that directory: the
+    matrix is an .npy file opened with mmap_mode="r", and the documents,
+    metadatas and ids are kept next to it as JSON.
+    """
+
+    def __init__(self, path=None, metadata=None):
+        self.path = path
+        self.metadata = metadata
+        self._lock = threading.Lock()
+        self._clear()
+        if path is not None and os.path.exists(os.path.join(path, _RECORDS_FILE)):
+            self._load()
+
+    def _clear(self):
+        self._matrix = None
+        self._size = 0
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self._rows = {}  # id -> row
+
+    def count(self):
+        return self._size
+
+    def add(self, ids, embeddings, documents, metadatas):
+        """Append rows; embeddings is a sequence of equal-length vectors."""
+        rows = _unit_rows(embeddings)
+        if rows.ndim != 2 or len(rows) != len(ids):
+            raise ValueError("Expected one embedding per id")
+
+        with self._lock:
+            if self._matrix is not None and rows.shape[1] != self._matrix.shape[1]:
+                raise ValueError(
+                    f"Embedding dimension {rows.shape[1]} does not match the store's "
+                    f"{self._matrix.shape[1]}"
+                )
+            self._reserve(self._size + len(rows), rows.shape[1])
+            self._matrix[self._size : self._size + len(rows)] = rows
+            for id_ in ids:
+                self._rows[id_] = self._size
+                self._size += 1
+            self.ids.extend(ids)
+            self.documents.extend(documents)
+            self.metadatas.extend(metadatas)
+            if self.path is not None:
+                self.save()
+
+    def _reserve(self, size, dim):
+        """Grow the matrix to hold at least size rows, doubling its capacity."""
+        capacity = 0 if self._matrix is None else len(self._matrix)
+        if size <= capacity:
+            return
+        # also replaces a read-only memory-mapped matrix by an in-memory one
+        matrix = np.empty((max(size, 2 * capacity, 16), dim), dtype=np.float32)
+        if self._size:
+            matrix[: self._size] = self._matrix[: self._size]
+        self._matrix = matrix
+
+    def update(self, ids, embeddings=None, documents=None, metadatas=None):
+        """Replace the embeddings, documents and/or metadatas of existing rows."""
+        with self._lock:
+            rows = [self._rows[id_] for id_ in ids]
+            if embeddings is not None:
+                if not self._matrix.flags.writeable:
+                    # copy a read-only memory-mapped matrix before writing to it
+                    self._matrix = np.array(self._matrix)
+                self._matrix[rows] = _unit_rows(embeddings)
+            for i, row in enumerate(rows):
+                if documents is not None:
+                    self.documents[row] = documents[i]
+                if metadatas is not None:
+                    self.metadatas[row] = metadatas[i]
+            if self.path is not None:
+                self.save()
+
+    def delete(self, ids):
+        """Drop rows by id, compacting the matrix."""
+        with self._lock:
+            dropped = {self._rows[id_] for id_ in ids if id_ in self._rows}
+            if not dropped:
+                return
+            keep = [row for row in range(self._size) if row not in dropped]
+            self._matrix = self._matrix[keep]
+            self._size = len(keep)
+            self.ids = [self.ids[row] for row in keep]
+            self.documents = [self.documents[row] for row in keep]
+            self.metadatas = [self.metadatas[row] for row in keep]
+            self._rows = {id_: row for row, id_ in enumerate(self.ids)}
+            if self.path is not None:
+                self.save()
+
+    def get(self, ids=None, include=("metadatas", "documents")):
+        """Rows by id, or every row when ids is None."""
+        with self._lock:
+            if ids is None:
+                rows = list(range(self._size))
+            else:
+                rows = [self._rows[id_] for id_ in ids if id_ in self._rows]
+            result = {"ids": [self.ids[row] for row in rows]}
+            if "documents" in include:
+                result["documents"] = [self.documents[row] for row in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [self.metadatas[row] for row in rows]
+            if "embeddings" in include:
+                result["embeddings"] = (
+                    np.array(self._matrix[rows]) if rows else np.empty((0, 0))
+                )
+        return result
+
+    def query(
+        self,
+        query_embeddings,
+        n_results=1,
+        include=("metadatas", "documents", "distances"),
+    ):
+        """Top n_results rows by cosine similarity for each query embedding."""
+        with self._lock:
+            # a view of the filled rows, later appends do not change it
+            matrix = self._matrix[: self._size] if self._size else None
+            ids, documents, metadatas = self.ids, self.documents, self.metadatas
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        results = {
+            "ids": [],
+            "documents": [],
+            "metadatas": [],
+            "distances": [],
+            "embeddings": [],
+        }
+        if matrix is None:
+            for key in results:
+                results[key] = [[] for _ in queries]
+            return results
+
+        scores = _unit_rows(queries) @ matrix.T
+
+        k = min(n_results, len(matrix))
+        if k < len(matrix):
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(len(matrix)), scores.shape)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        for q_top, q_scores in zip(top, top_scores):
+            results["ids"].append([ids[i] for i in q_top])
+            results["documents"].append([documents[i] for i in q_top])
+            results["metadatas"].append([metadatas[i] for i in q_top])
+            results["distances"].append((1 - q_scores).tolist())
+            results["embeddings"].append(matrix[q_top])
+        return {
+            key: value
+            for key, value in results.items()
+            if key == "ids" or key in include
+        }
+
+    def clear(self):
+        """Drop every row, and the saved files."""
+        with self._lock:
+            self._clear()
+            if self.path is not None:
+                for file_name in [_EMBEDDINGS_FILE, _RECORDS_FILE]:
+                    if os.path.exists(os.path.join(self.path, file_name)):
+                        os.remove(os.path.join(self.path, file_name))
+
+    def save(self):
+        """Write the store to path, replacing the files atomically."""
+        os.makedirs(self.path, exist_ok=True)
+        embeddings_path = os.path.join(self.path, _EMBEDDINGS_FILE)
+        with open(embeddings_path + ".tmp", "wb") as f:
+            np.save(f, self._matrix[: self._size])
+        os.replace(embeddings_path + ".tmp", embeddings_path)
+
+        records_path = os.path.join(self.path, _RECORDS_FILE)
+        with open(records_path + ".tmp", "w") as f:
+            json.dump(
+                {
+                    "metadata": self.metadata,
+                    "ids": self.ids,
+                    "documents": self.documents,
+                    "metadatas": self.metadatas,
+                },
+                f,
+            )
+        os.replace(records_path + ".tmp", records_path)
+
+    def _load(self):
+        with open(os.path.join(self.path, _RECORDS_FILE)) as f:
+            records = json.load(f)
+        self.metadata = records["metadata"]
+        self.ids = records["ids"]
+        self.documents = records["documents"]
+        self.metadatas = records["metadatas"]
+        if self.ids:
+            self._matrix = np.load(
+                os.path.join(self.path, _EMBEDDINGS_FILE), mmap_mode="r"
+            )
+            self._size = len(self._matrix)
+        self._rows = {id_: row for row, id_ in enumerate(self.ids)}
+
+
+if __name__ == "__main__":
+    # Benchmark add_situations / get_memories of the Chroma and NumPy backends
+    import random
+    import time
+
+    from tradingagents.agents.utils.memory import FinancialSituationMemory
+    from tradingagents.default_config import DEFAULT_CONFIG
+
+    words = (
+        "inflation rates yields dollar tech energy banks earnings guidance "
+        "volatility selloff rally momentum breakout support resistance volume "
+        "margins revenue debt buyback dividend downgrade upgrade sentiment"
+    ).split()
+    rng = random.Random(0)
+
+    def text():
+        return " ".join(rng.choice(words) for _ in range(40))
+
+    n_situations, batch, n_queries = 5000, 50, 500
+    situations = [(text(), text()) for _ in range(n_situations)]
+    queries = [text() for _ in range(n_queries)]
+
+    for backend in ["chroma", "numpy"]:
+        config = {**DEFAULT_CONFIG, "backend_url": "", "memory_backend": backend}
+        start = time.perf_counter()
+        memory = FinancialSituationMemory(f"benchmark_{backend}", config)
+        created = time.perf_counter()
+        for i in range(0, n_situations, batch):
+            memory.add_situations(situations[i : i + batch])
+        added = time.perf_counter()
+        for query in queries:
+            memory.get_memories(query, n_matches=2)
+        queried = time.perf_counter()
+        print(
+            f"{backend:>6}: create {1000 * (created - start):7.1f} ms, "
+            f"add_situations {n_situations / (added - created):8.0f} situations/s, "
+            f"get_memories {n_queries / (queried - added):8.0f} queries/s"
+        )
@@ -1,4 +1,4 @@
-from .finnhub_utils import get_data_in_range
+from .finnhub_utils import get_data_in_range, preload_finnhub_data
 from .googlenews_utils import getNewsData
 from .yfin_utils import YFinanceUtils
 from .reddit_utils import fetch_top_from_category
@@ -1,5 +1,58 @@
+import bisect
 import json
 import os
+import threading
+
+FINNHUB_DATA_TYPES = [
+    "insider_trans",
+    "SEC_filings",
+    "news_data",
+    "insider_senti",
+    "fin_as_reported",
+]
+
+# data path -> (mtime, sorted dates, position of each date in the file, data)
+_parsed_files = {}
+_parsed_files_lock = threading.Lock()
+
+
+def get_data_path(ticker, data_type, data_dir, period=None):
+    """Path of the formatted finnhub json of a ticker and data type."""
+    if period:
+        return os.path.join(
+            data_dir,
+            "finnhub_data",
+            data_type,
+            f"{ticker}_{period}_data_formatted.json",
+        )
+    return os.path.join(
+        data_dir, "finnhub_data", data_type, f"{ticker}_data_formatted.json"
+    )
+
+
+def load_data_file(data_path):
+    """
+    Parse a formatted finnhub json once and index it by date.
+    The parsed file is cached until its modification time changes.
+    Returns the sorted dates, the position of each date in the file, and the data.
+    """
+    mtime = os.stat(data_path).st_mtime
+
+    with _parsed_files_lock:
+        cached = _parsed_files.get(data_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1:]
+
+    with open(data_path, "r") as f:
+        data = json.load(f)
+
+    positions = {key: i for i, key in enumerate(data)}
+    dates = sorted(data)
+
+    with _parsed_files_lock:
+        _parsed_files[data_path] = (mtime, dates, positions, data)
+
+    return dates, positions, data
 
 
 def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=None):
@@ -13,24 +66,33 @@ def get_data_in_range(ticker, start_date, end_date, data_type, data_dir, period=
         period (str): Default to none, if there is a period specified, should be annual or quarterly.
     """
 
-    if period:
-        data_path = os.path.join(
-            data_dir,
-            "finnhub_data",
-            data_type,
-            f"{ticker}_{period}_data_formatted.json",
-        )
-    else:
-        data_path = os.path.join(
-            data_dir, "finnhub_data", data_type, f"{ticker}_data_formatted.json"
-        )
-
-    data = open(data_path, "r")
-    data = json.load(data)
+    data_path = get_data_path(ticker, data_type, data_dir, period)
+    dates, positions, data = load_data_file(data_path)
 
     # filter keys (date, str in format YYYY-MM-DD) by the date range (str, str in format YYYY-MM-DD)
+    in_range = dates[
+        bisect.bisect_left(dates, start_date) : bisect.bisect_right(dates, end_date)
+    ]
+
+    # keep the order of the dates in the file
     filtered_data = {}
-    for key, value in data.items():
-        if start_date <= key <= end_date and len(value) > 0:
-            filtered_data[key] = value
+    for key in sorted(in_range, key=positions.__getitem__):
+        if len(data[key]) > 0:
+            filtered_data[key] = data[key]
     return filtered_data
+
+
+def preload_finnhub_data(ticker, data_dir):
+    """
+    Parse every finnhub data type saved on disk for a ticker in one go, so later
+    range queries are served from memory.
+    Returns the paths of the files that were loaded.
+    """
+    loaded = []
+    for data_type in FINNHUB_DATA_TYPES:
+        for period in [None, "annual", "quarterly"]:
+            data_path = get_data_path(ticker, data_type, data_dir, period)
+            if os.path.exists(data_path):
+                load_data_file(data_path)
+                loaded.append(data_path)
+    return loaded
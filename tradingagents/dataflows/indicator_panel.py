@@ -0,0 +1,81 @@
+import hashlib
+import os
+from typing import Annotated, Dict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from stockstats import wrap
+
+from .utils import write_feather_atomic
+
+# every indicator the market analyst can request, see best_ind_params in interface.py
+PANEL_INDICATORS = [
+    "close_50_sma",
+    "close_200_sma",
+    "close_10_ema",
+    "macd",
+    "macds",
+    "macdh",
+    "rsi",
+    "boll",
+    "boll_ub",
+    "boll_lb",
+    "atr",
+    "vwma",
+    "mfi",
+]
+
+
+def price_signature(
+    price_data: Annotated[pd.DataFrame, "price bars with a YYYY-mm-dd Date column"],
+) -> Dict[bytes, bytes]:
+    """Identify the price history a panel was computed from, including a hash of
+    its contents so corrected bars invalidate the panel too."""
+    dates = price_data["Date"]
+    content_hash = hashlib.sha1(
+        pd.util.hash_pandas_object(price_data, index=False).values.tobytes()
+    ).hexdigest()
+    return {
+        b"price_rows": str(len(price_data)).encode(),
+        b"price_first_date": str(dates.iloc[0] if len(dates) else "").encode(),
+        b"price_last_date": str(dates.iloc[-1] if len(dates) else "").encode(),
+        b"price_hash": content_hash.encode(),
+    }
+
+
+def build_indicator_panel(
+    price_data: Annotated[pd.DataFrame, "price bars with a YYYY-mm-dd Date column"],
+) -> pd.DataFrame:
+    """Compute all PANEL_INDICATORS in one pass over a price history."""
+    df = wrap(price_data.copy())
+    panel = {"Date": df["Date"].values}
+    for indicator in PANEL_INDICATORS:
+        panel[indicator] = df[indicator].values
+    return pd.DataFrame(panel)
+
+
+def load_indicator_panel(
+    price_data: Annotated[pd.DataFrame, "price bars with a YYYY-mm-dd Date column"],
+    panel_path: Annotated[str, "Feather file the panel is persisted to"],
+) -> pd.DataFrame:
+    """
+    Load the persisted indicator panel of a price history, rebuilding it when the
+    price history has changed (e.g. new bars arrived) since it was materialized.
+    """
+    signature = price_signature(price_data)
+
+    if os.path.exists(panel_path):
+        table = feather.read_table(panel_path, memory_map=True)
+        metadata = table.schema.metadata or {}
+        if all(metadata.get(key) == value for key, value in signature.items()):
+            return table.to_pandas()
+
+    panel = build_indicator_panel(price_data)
+
+    table = pa.Table.from_pandas(panel, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **signature})
+    os.makedirs(os.path.dirname(panel_path), exist_ok=True)
+    write_feather_atomic(table, panel_path)
+
+    return panel
@@ -1,8 +1,10 @@
 from typing import Annotated, Dict
-from .reddit_utils import fetch_top_from_category
+from .reddit_utils import fetch_top_from_category_range
 from .yfin_utils import *
 from .stockstats_utils import *
 from .googlenews_utils import *
+from .price_cache import get_offline_price_frame
+from .simfin_store import get_simfin_store
 from .finnhub_utils import get_data_in_range
 from dateutil.relativedelta import relativedelta
 from concurrent.futures import ThreadPoolExecutor
@@ -10,7 +12,6 @@ from datetime import datetime
 import json
 import os
 import pandas as pd
-from tqdm import tqdm
 import yfinance as yf
 from openai import OpenAI
 from .config import get_config, set_config, DATA_DIR
@@ -58,6 +59,15 @@ def get_finnhub_news(
     return f"## {ticker} News, from {before} to {curr_date}:\n" + str(combined_result)
 
 
+def _entry_key(entry):
+    """Hashable canonical key of a finnhub entry, equal for entries that compare equal."""
+    if isinstance(entry, dict):
+        return tuple(sorted((k, _entry_key(v)) for k, v in entry.items()))
+    if isinstance(entry, list):
+        return tuple(_entry_key(v) for v in entry)
+    return entry
+
+
 def get_finnhub_company_insider_sentiment(
     ticker: Annotated[str, "ticker symbol for the company"],
     curr_date: Annotated[
@@ -84,17 +94,20 @@ def get_finnhub_company_insider_sentiment(
     if len(data) == 0:
         return ""
 
-    result_str = ""
-    seen_dicts = []
+    result = []
+    seen_keys = set()
     for date, senti_list in data.items():
         for entry in senti_list:
-            if entry not in seen_dicts:
-                result_str += f"### {entry['year']}-{entry['month']}:\nChange: {entry['change']}\nMonthly Share Purchase Ratio: {entry['mspr']}\n\n"
-                seen_dicts.append(entry)
+            key = _entry_key(entry)
+            if key not in seen_keys:
+                result.append(
+                    f"### {entry['year']}-{entry['month']}:\nChange: {entry['change']}\nMonthly Share Purchase Ratio: {entry['mspr']}\n\n"
+                )
+                seen_keys.add(key)
 
     return (
         f"## {ticker} Insider Sentiment Data for {before} to {curr_date}:\n"
-        + result_str
+        + "".join(result)
         + "The change field refers to the net buying/selling from all insiders' transactions. The mspr field refers to monthly share purchase ratio."
     )
 
@@ -125,18 +138,20 @@ def get_finnhub_company_insider_transactions(
     if len(data) == 0:
         return ""
 
-    result_str = ""
-
-    seen_dicts = []
+    result = []
+    seen_keys = set()
     for date, senti_list in data.items():
         for entry in senti_list:
-            if entry not in seen_dicts:
-                result_str += f"### Filing Date: {entry['filingDate']}, {entry['name']}:\nChange:{entry['change']}\nShares: {entry['share']}\nTransaction Price: {entry['transactionPrice']}\nTransaction Code: {entry['transactionCode']}\n\n"
-                seen_dicts.append(entry)
+            key = _entry_key(entry)
+            if key not in seen_keys:
+                result.append(
+                    f"### Filing Date: {entry['filingDate']}, {entry['name']}:\nChange:{entry['change']}\nShares: {entry['share']}\nTransaction Price: {entry['transactionPrice']}\nTransaction Code: {entry['transactionCode']}\n\n"
+                )
+                seen_keys.add(key)
 
     return (
         f"## {ticker} insider transactions from {before} to {curr_date}:\n"
-        + result_str
+        + "".join(result)
         + "The change field reflects the variation in share count—here a negative number indicates a reduction in holdings—while share specifies the total number of shares involved. The transactionPrice denotes the per-share price at which the trade was executed, and transactionDate marks when the transaction occurred. The name field identifies the insider making the trade, and transactionCode (e.g., S for sale) clarifies the nature of the transaction. FilingDate records when the transaction was officially reported, and the unique id links to the specific SEC filing, as indicated by the source. Additionally, the symbol ties the transaction to a particular company, isDerivative flags whether the trade involves derivative securities, and currency notes the currency context of the transaction."
     )
 
@@ -149,35 +164,16 @@ def get_simfin_balance_sheet(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "balance_sheet",
-        "companies",
-        "us",
-        f"us-balance-{freq}.csv",
+    # the statement file is parsed once and indexed by ticker and publish date
+    latest_balance_sheet = get_simfin_store(DATA_DIR).latest(
+        "balance_sheet", ticker, freq, curr_date
     )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_balance_sheet is None:
         print("No balance sheet available before the given current date.")
         return ""
 
-    # Get the most recent balance sheet by selecting the row with the latest Publish Date
-    latest_balance_sheet = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_balance_sheet = latest_balance_sheet.drop("SimFinId")
 
@@ -196,35 +192,16 @@ def get_simfin_cashflow(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "cash_flow",
-        "companies",
-        "us",
-        f"us-cashflow-{freq}.csv",
+    # the statement file is parsed once and indexed by ticker and publish date
+    latest_cash_flow = get_simfin_store(DATA_DIR).latest(
+        "cash_flow", ticker, freq, curr_date
     )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_cash_flow is None:
         print("No cash flow statement available before the given current date.")
         return ""
 
-    # Get the most recent cash flow statement by selecting the row with the latest Publish Date
-    latest_cash_flow = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_cash_flow = latest_cash_flow.drop("SimFinId")
 
@@ -243,35 +220,16 @@ def get_simfin_income_statements(
     ],
     curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
 ):
-    data_path = os.path.join(
-        DATA_DIR,
-        "fundamental_data",
-        "simfin_data_all",
-        "income_statements",
-        "companies",
-        "us",
-        f"us-income-{freq}.csv",
+    # the statement file is parsed once and indexed by ticker and publish date
+    latest_income = get_simfin_store(DATA_DIR).latest(
+        "income_statements", ticker, freq, curr_date
     )
-    df = pd.read_csv(data_path, sep=";")
-
-    # Convert date strings to datetime objects and remove any time components
-    df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
-    df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
-
-    # Convert the current date to datetime and normalize
-    curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
-
-    # Filter the DataFrame for the given ticker and for reports that were published on or before the current date
-    filtered_df = df[(df["Ticker"] == ticker) & (df["Publish Date"] <= curr_date_dt)]
 
     # Check if there are any available reports; if not, return a notification
-    if filtered_df.empty:
+    if latest_income is None:
         print("No income statement available before the given current date.")
         return ""
 
-    # Get the most recent income statement by selecting the row with the latest Publish Date
-    latest_income = filtered_df.loc[filtered_df["Publish Date"].idxmax()]
-
     # drop the SimFinID column
     latest_income = latest_income.drop("SimFinId")
 
@@ -326,26 +284,17 @@ def get_reddit_global_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    posts = []
-    # iterate from start_date to end_date
-    curr_date = datetime.strptime(before, "%Y-%m-%d")
-
-    total_iterations = (start_date - curr_date).days + 1
-    pbar = tqdm(desc=f"Getting Global News on {start_date}", total=total_iterations)
-
-    while curr_date <= start_date:
-        curr_date_str = curr_date.strftime("%Y-%m-%d")
-        fetch_result = fetch_top_from_category(
-            "global_news",
-            curr_date_str,
-            max_limit_per_day,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
-        )
-        posts.extend(fetch_result)
-        curr_date += relativedelta(days=1)
-        pbar.update(1)
+    end_date = start_date.strftime("%Y-%m-%d")
 
-    pbar.close()
+    # fetch the whole window with one pass over each subreddit
+    posts_by_day = fetch_top_from_category_range(
+        "global_news",
+        before,
+        end_date,
+        max_limit_per_day,
+        data_path=os.path.join(DATA_DIR, "reddit_data"),
+    )
+    posts = [post for day_posts in posts_by_day.values() for post in day_posts]
 
     if len(posts) == 0:
         return ""
@@ -357,7 +306,7 @@ def get_reddit_global_news(
         else:
             news_str += f"### {post['title']}\n\n{post['content']}\n\n"
 
-    return f"## Global News Reddit, from {before} to {curr_date}:\n{news_str}"
+    return f"## Global News Reddit, from {before} to {end_date}:\n{news_str}"
 
 
 def get_reddit_company_news(
@@ -380,31 +329,18 @@ def get_reddit_company_news(
     before = start_date - relativedelta(days=look_back_days)
     before = before.strftime("%Y-%m-%d")
 
-    posts = []
-    # iterate from start_date to end_date
-    curr_date = datetime.strptime(before, "%Y-%m-%d")
+    end_date = start_date.strftime("%Y-%m-%d")
 
-    total_iterations = (start_date - curr_date).days + 1
-    pbar = tqdm(
-        desc=f"Getting Company News for {ticker} on {start_date}",
-        total=total_iterations,
+    # fetch the whole window with one pass over each subreddit
+    posts_by_day = fetch_top_from_category_range(
+        "company_news",
+        before,
+        end_date,
+        max_limit_per_day,
+        ticker,
+        data_path=os.path.join(DATA_DIR, "reddit_data"),
     )
-
-    while curr_date <= start_date:
-        curr_date_str = curr_date.strftime("%Y-%m-%d")
-        fetch_result = fetch_top_from_category(
-            "company_news",
-            curr_date_str,
-            max_limit_per_day,
-            ticker,
-            data_path=os.path.join(DATA_DIR, "reddit_data"),
-        )
-        posts.extend(fetch_result)
-        curr_date += relativedelta(days=1)
-
-        pbar.update(1)
-
-    pbar.close()
+    posts = [post for day_posts in posts_by_day.values() for post in day_posts]
 
     if len(posts) == 0:
         return ""
@@ -416,7 +352,7 @@ def get_reddit_company_news(
         else:
             news_str += f"### {post['title']}\n\n{post['content']}\n\n"
 
-    return f"##{ticker} News Reddit, from {before} to {curr_date}:\n\n{news_str}"
+    return f"##{ticker} News Reddit, from {before} to {end_date}:\n\n{news_str}"
 
 
 def get_stock_stats_indicators_window(
@@ -511,39 +447,28 @@ def get_stock_stats_indicators_window(
     curr_date = datetime.strptime(curr_date, "%Y-%m-%d")
     before = curr_date - relativedelta(days=look_back_days)
 
-    if not online:
-        # read from YFin data
-        data = pd.read_csv(
-            os.path.join(
-                DATA_DIR,
-                f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-            )
-        )
-        data["Date"] = pd.to_datetime(data["Date"], utc=True)
-        dates_in_df = data["Date"].astype(str).str[:10]
-
-        ind_string = ""
-        while curr_date >= before:
-            # only do the trading dates
-            if curr_date.strftime("%Y-%m-%d") in dates_in_df.values:
-                indicator_value = get_stockstats_indicator(
-                    symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
-                )
-
-                ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
+    # compute the indicator once over the whole series and slice the window out of it
+    indicator_values = StockstatsUtils.get_stock_stats_window(
+        symbol,
+        indicator,
+        before.strftime("%Y-%m-%d"),
+        end_date,
+        os.path.join(DATA_DIR, "market_data", "price_data"),
+        online=online,
+    )
 
-            curr_date = curr_date - relativedelta(days=1)
-    else:
-        # online gathering
-        ind_string = ""
-        while curr_date >= before:
-            indicator_value = get_stockstats_indicator(
-                symbol, indicator, curr_date.strftime("%Y-%m-%d"), online
+    ind_string = ""
+    while curr_date >= before:
+        curr_date_str = curr_date.strftime("%Y-%m-%d")
+        if curr_date_str in indicator_values:
+            ind_string += f"{curr_date_str}: {indicator_values[curr_date_str]}\n"
+        elif online:
+            # online output keeps one line per calendar day
+            ind_string += (
+                f"{curr_date_str}: N/A: Not a trading day (weekend or holiday)\n"
             )
 
-            ind_string += f"{curr_date.strftime('%Y-%m-%d')}: {indicator_value}\n"
-
-            curr_date = curr_date - relativedelta(days=1)
+        curr_date = curr_date - relativedelta(days=1)
 
     result_str = (
         f"## {indicator} values from {before.strftime('%Y-%m-%d')} to {end_date}:\n\n"
@@ -595,12 +520,9 @@ def get_YFin_data_window(
     start_date = before.strftime("%Y-%m-%d")
 
     # read in data
-    data = pd.read_csv(
-        os.path.join(
-            DATA_DIR,
-            f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-        )
-    )
+    data = get_offline_price_frame(
+        symbol, os.path.join(DATA_DIR, "market_data", "price_data")
+    ).copy()
 
     # Extract just the date part for comparison
     data["DateOnly"] = data["Date"].str[:10]
@@ -673,12 +595,9 @@ def get_YFin_data(
     end_date: Annotated[str, "End date in yyyy-mm-dd format"],
 ) -> str:
     # read in data
-    data = pd.read_csv(
-        os.path.join(
-            DATA_DIR,
-            f"market_data/price_data/{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-        )
-    )
+    data = get_offline_price_frame(
+        symbol, os.path.join(DATA_DIR, "market_data", "price_data")
+    ).copy()
 
     if end_date > "2025-03-25":
         raise Exception(
@@ -0,0 +1,205 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Annotated, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from .config import get_config
+from .price_store import get_price_store
+from .utils import write_feather_atomic
+
+
+class PriceFrameCache:
+    """
+    Process-wide in-memory cache of price frames keyed by (symbol, source).
+    Entries are evicted in least-recently-used order once the total size of the
+    cached frames exceeds the memory budget.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Annotated[
+            Optional[int],
+            "memory budget in bytes. If None, uses the price_cache_max_bytes config value.",
+        ] = None,
+    ):
+        self._max_bytes = max_bytes
+        self._frames: "OrderedDict[Tuple[str, Hashable], pd.DataFrame]" = OrderedDict()
+        self._sizes: Dict[Tuple[str, Hashable], int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple[str, Hashable], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return get_config()["price_cache_max_bytes"]
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, symbol: str, source: Hashable) -> Optional[pd.DataFrame]:
+        """Return the cached frame for (symbol, source), or None if it is not cached."""
+        key = (symbol, source)
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                return None
+            self._frames.move_to_end(key)
+            return frame
+
+    def put(self, symbol: str, source: Hashable, frame: pd.DataFrame) -> None:
+        """Insert a frame and evict least recently used frames beyond the budget."""
+        key = (symbol, source)
+        size = int(frame.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            if key in self._frames:
+                self._total_bytes -= self._sizes.pop(key)
+                del self._frames[key]
+            self._frames[key] = frame
+            self._sizes[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def get_or_load(
+        self,
+        symbol: str,
+        source: Hashable,
+        loader: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """
+        Return the cached frame for (symbol, source), calling loader() on a miss.
+        Concurrent misses on the same key load the frame only once.
+        The returned frame is shared; callers must copy it before mutating it.
+        """
+        frame = self.get(symbol, source)
+        if frame is not None:
+            self.hits += 1
+            return frame
+
+        key = (symbol, source)
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            frame = self.get(symbol, source)
+            if frame is not None:
+                self.hits += 1
+                return frame
+            self.misses += 1
+            frame = loader()
+            self.put(symbol, source, frame)
+
+        with self._lock:
+            self._load_locks.pop(key, None)
+
+        return frame
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Drop all cached frames, or only the frames of one symbol."""
+        with self._lock:
+            for key in list(self._frames):
+                if symbol is None or key[0] == symbol:
+                    self._total_bytes -= self._sizes.pop(key)
+                    del self._frames[key]
+
+    def _evict(self) -> None:
+        # always keep the most recently inserted frame, even if it is over budget on its own
+        max_bytes = self.max_bytes
+        while self._total_bytes > max_bytes and len(self._frames) > 1:
+            key, _ = self._frames.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(key)
+
+
+_price_cache = PriceFrameCache()
+
+
+def get_price_cache() -> PriceFrameCache:
+    """Get the price-frame cache shared by all market data functions."""
+    return _price_cache
+
+
+def _offline_csv_path(symbol: str, data_dir: str) -> str:
+    return os.path.join(data_dir, f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv")
+
+
+def _offline_snapshot_path(symbol: str, data_path: str) -> str:
+    # snapshots of the CSVs of different data directories must not collide
+    data_path_hash = hashlib.sha1(
+        os.path.abspath(data_path).encode()
+    ).hexdigest()[:12]
+    return os.path.join(
+        get_price_store().store_dir,
+        f"{symbol.upper()}-offline-{data_path_hash}.feather",
+    )
+
+
+def _csv_signature(data_path: str) -> bytes:
+    stat = os.stat(data_path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}".encode()
+
+
+def _read_offline_snapshot(symbol: str, data_path: str) -> Optional[pa.Table]:
+    """The memory-mapped Feather snapshot of an offline CSV, or None if it is
+    missing or stale."""
+    snapshot_path = _offline_snapshot_path(symbol, data_path)
+    if not os.path.exists(snapshot_path):
+        return None
+    table = feather.read_table(snapshot_path, memory_map=True)
+    metadata = table.schema.metadata or {}
+    if metadata.get(b"csv_signature") != _csv_signature(data_path):
+        return None
+    return table
+
+
+def get_offline_price_frame(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    data_dir: Annotated[str, "directory where the Yahoo Finance CSVs are stored"],
+) -> pd.DataFrame:
+    """
+    Get the raw offline Yahoo Finance frame of a symbol, loading it at most once.
+    The frame is read from its Feather snapshot (see write_offline_snapshot) when
+    that is up to date with the CSV, and parsed from the CSV otherwise.
+    """
+    data_path = _offline_csv_path(symbol, data_dir)
+
+    def load_offline_data():
+        snapshot = _read_offline_snapshot(symbol, data_path)
+        if snapshot is None:
+            return pd.read_csv(data_path)
+        return snapshot.to_pandas()
+
+    return _price_cache.get_or_load(
+        symbol, ("yfin-offline", data_path), load_offline_data
+    )
+
+
+def write_offline_snapshot(
+    symbol: Annotated[str, "ticker symbol of the company"],
+    data_dir: Annotated[str, "directory where the Yahoo Finance CSVs are stored"],
+) -> None:
+    """
+    Write the offline Yahoo Finance CSV of a symbol to a Feather snapshot in the
+    price store, unless an up-to-date one exists. Other processes then
+    memory-map the snapshot instead of parsing the CSV again.
+    """
+    data_path = _offline_csv_path(symbol, data_dir)
+    signature = _csv_signature(data_path)
+    if _read_offline_snapshot(symbol, data_path) is not None:
+        return
+
+    table = pa.Table.from_pandas(
+        get_offline_price_frame(symbol, data_dir), preserve_index=False
+    )
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), b"csv_signature": signature}
+    )
+    write_feather_atomic(table, _offline_snapshot_path(symbol, data_path))
@@ -0,0 +1,180 @@
+import os
+import threading
+from typing import Annotated, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import yfinance as yf
+
+from .config import get_config
+from .utils import write_feather_atomic
+
+PRICE_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+
+def _empty_bars() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            column: pd.Series(dtype="datetime64[ns]" if column == "Date" else "float64")
+            for column in PRICE_COLUMNS
+        }
+    )
+
+
+def _dates(table: pa.Table) -> np.ndarray:
+    return table.column("Date").to_numpy().astype("datetime64[ns]")
+
+
+class PriceStore:
+    """
+    Columnar on-disk store of daily price bars with one uncompressed Feather file
+    per symbol. Updates only download the trailing bars that are missing from
+    the stored history.
+
+    Files are memory-mapped: read_table is zero-copy, and update slices the
+    requested dates out of the mapped table so only that window is converted to
+    a pandas DataFrame.
+    """
+
+    def __init__(
+        self,
+        store_dir: Annotated[str, "directory where the Feather files are stored"],
+    ):
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def path(self, symbol: Annotated[str, "ticker symbol of the company"]) -> str:
+        return os.path.join(self.store_dir, f"{symbol.upper()}.feather")
+
+    def read(
+        self, symbol: Annotated[str, "ticker symbol of the company"]
+    ) -> Optional[pd.DataFrame]:
+        """Read the stored bars of a symbol as a DataFrame, or None if nothing has been stored yet."""
+        table = self.read_table(symbol)
+        if table is None:
+            return None
+        return table.to_pandas()
+
+    def read_table(
+        self, symbol: Annotated[str, "ticker symbol of the company"]
+    ) -> Optional[pa.Table]:
+        """Zero-copy read of the stored bars of a symbol: an Arrow table over the
+        memory-mapped file, or None if nothing has been stored yet."""
+        path = self.path(symbol)
+        if not os.path.exists(path):
+            return None
+        return feather.read_table(path, memory_map=True)
+
+    def write(
+        self,
+        symbol: Annotated[str, "ticker symbol of the company"],
+        data: Annotated[pd.DataFrame, "bars with the PRICE_COLUMNS columns"],
+        fetched_through: Annotated[
+            Optional[str], "end date (exclusive) the history has been fetched up to"
+        ] = None,
+    ) -> None:
+        """Atomically replace the stored bars of a symbol."""
+        table = pa.Table.from_pandas(
+            data[PRICE_COLUMNS].reset_index(drop=True), preserve_index=False
+        )
+        if fetched_through is not None:
+            table = table.replace_schema_metadata(
+                {
+                    **(table.schema.metadata or {}),
+                    b"fetched_through": fetched_through.encode(),
+                }
+            )
+
+        path = self.path(symbol)
+        write_feather_atomic(table, path)
+
+    def update(
+        self,
+        symbol: Annotated[str, "ticker symbol of the company"],
+        start_date: Annotated[str, "first date of the history, YYYY-mm-dd"],
+        end_date: Annotated[str, "end date of the history (exclusive), YYYY-mm-dd"],
+    ) -> pd.DataFrame:
+        """
+        Bring the stored history of a symbol up to end_date by appending only the
+        missing trailing bars, and return the bars in [start_date, end_date).
+        """
+        with self._lock:
+            table = self.read_table(symbol)
+
+            if table is None or table.num_rows == 0:
+                fetch_start = start_date
+            else:
+                last_date = pd.Timestamp(_dates(table)[-1])
+                fetch_start = (last_date + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+                # skip the download when the gap was already fetched and had no new bars
+                metadata = table.schema.metadata or {}
+                fetched_through = metadata.get(b"fetched_through", b"").decode()
+                fetch_start = max(fetch_start, fetched_through)
+
+            if fetch_start < end_date:
+                data = table.to_pandas() if table is not None else None
+                new_bars = self._download(symbol, fetch_start, end_date)
+                if data is not None and not new_bars.empty:
+                    data = pd.concat([data, new_bars], ignore_index=True)
+                    data = (
+                        data.drop_duplicates(subset="Date", keep="last")
+                        .sort_values("Date")
+                        .reset_index(drop=True)
+                    )
+                elif data is None:
+                    data = new_bars
+                self.write(symbol, data, fetched_through=end_date)
+                table = self.read_table(symbol)
+
+        if table is None or table.num_rows == 0:
+            return _empty_bars()
+
+        # the bars are sorted by date, slice the window before converting
+        dates = _dates(table)
+        first, last = np.searchsorted(
+            dates,
+            [
+                pd.Timestamp(start_date).to_datetime64(),
+                pd.Timestamp(end_date).to_datetime64(),
+            ],
+        )
+        return table.slice(first, last - first).to_pandas()
+
+    @staticmethod
+    def _download(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+        data = yf.download(
+            symbol,
+            start=start_date,
+            end=end_date,
+            multi_level_index=False,
+            progress=False,
+            auto_adjust=True,
+        )
+        if data.empty:
+            return _empty_bars()
+
+        data = data.reset_index()
+        data["Date"] = pd.to_datetime(data["Date"]).dt.tz_localize(None)
+        return data[PRICE_COLUMNS]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_price_store(
+    store_dir: Annotated[
+        Optional[str],
+        "directory of the store. If None, uses price_store under the data_cache_dir config value.",
+    ] = None,
+) -> PriceStore:
+    """Get the shared PriceStore for a directory."""
+    if store_dir is None:
+        store_dir = os.path.join(get_config()["data_cache_dir"], "price_store")
+    with _stores_lock:
+        if store_dir not in _stores:
+            _stores[store_dir] = PriceStore(store_dir)
+        return _stores[store_dir]
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Annotated, Dict, Iterator, List
+
+from .config import get_config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_files (
+    category TEXT NOT NULL,
+    data_file TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (category, data_file)
+);
+CREATE TABLE IF NOT EXISTS posts (
+    category TEXT NOT NULL,
+    data_file TEXT NOT NULL,
+    post_date TEXT NOT NULL,
+    upvotes INTEGER NOT NULL,
+    line_no INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS posts_by_day
+    ON posts (category, data_file, post_date, upvotes DESC, line_no);
+"""
+
+
+class RedditIndex:
+    """
+    SQLite index over the subreddit .jsonl dumps of a reddit data folder, partitioned
+    by category, subreddit file and post date, with posts pre-sorted by upvotes.
+    A subreddit file is parsed once and only re-ingested when it changes on disk.
+    """
+
+    def __init__(
+        self,
+        data_path: Annotated[str, "Path to the reddit data folder."],
+        index_path: Annotated[str, "Path to the SQLite index file."],
+    ):
+        self.data_path = data_path
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._synced_categories = set()
+
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.index_path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def sync(
+        self,
+        category: Annotated[
+            str, "Category to index. Collection of subreddits."
+        ],
+    ) -> None:
+        """Ingest the subreddit files of a category that are new or changed since the last sync."""
+        category_dir = os.path.join(self.data_path, category)
+
+        with self._lock:
+            with self._connect() as conn:
+                changed, removed = self._changes(conn, category, category_dir)
+
+            if changed or removed:
+                with self._connect() as conn:
+                    self._begin_immediate(conn)
+                    # another process may have ingested the files while this one
+                    # waited for the write lock
+                    changed, removed = self._changes(conn, category, category_dir)
+
+                    for data_file, stat in changed:
+                        conn.execute(
+                            "DELETE FROM posts WHERE category = ? AND data_file = ?",
+                            (category, data_file),
+                        )
+                        conn.executemany(
+                            "INSERT INTO posts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            self._parse_file(category, category_dir, data_file),
+                        )
+                        conn.execute(
+                            "INSERT OR REPLACE INTO source_files VALUES (?, ?, ?, ?)",
+                            (category, data_file, stat.st_mtime, stat.st_size),
+                        )
+
+                    for data_file in removed:
+                        conn.execute(
+                            "DELETE FROM posts WHERE category = ? AND data_file = ?",
+                            (category, data_file),
+                        )
+                        conn.execute(
+                            "DELETE FROM source_files WHERE category = ? AND data_file = ?",
+                            (category, data_file),
+                        )
+
+            self._synced_categories.add(category)
+
+    @staticmethod
+    def _changes(conn: sqlite3.Connection, category: str, category_dir: str):
+        """The (file, stat) of the new or changed subreddit files of a category, and
+        the indexed files that are gone from disk."""
+        indexed = {
+            data_file: (mtime, size)
+            for data_file, mtime, size in conn.execute(
+                "SELECT data_file, mtime, size FROM source_files WHERE category = ?",
+                (category,),
+            )
+        }
+
+        changed = []
+        on_disk = set()
+        for data_file in os.listdir(category_dir):
+            if not data_file.endswith(".jsonl"):
+                continue
+            on_disk.add(data_file)
+
+            stat = os.stat(os.path.join(category_dir, data_file))
+            if indexed.get(data_file) != (stat.st_mtime, stat.st_size):
+                changed.append((data_file, stat))
+
+        return changed, sorted(set(indexed) - on_disk)
+
+    @staticmethod
+    def _begin_immediate(conn: sqlite3.Connection) -> None:
+        """Take the write lock, waiting for as long as another process ingests."""
+        while True:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+
+    def ensure_synced(self, category: str) -> None:
+        """Sync a category the first time it is queried in this process."""
+        if category not in self._synced_categories:
+            self.sync(category)
+
+    @staticmethod
+    def _parse_file(category: str, category_dir: str, data_file: str):
+        with open(os.path.join(category_dir, data_file), "rb") as f:
+            for line_no, line in enumerate(f):
+                # skip empty lines
+                if not line.strip():
+                    continue
+
+                parsed_line = json.loads(line)
+                post_date = datetime.utcfromtimestamp(
+                    parsed_line["created_utc"]
+                ).strftime("%Y-%m-%d")
+
+                yield (
+                    category,
+                    data_file,
+                    post_date,
+                    parsed_line["ups"],
+                    line_no,
+                    parsed_line["title"],
+                    parsed_line["selftext"],
+                    parsed_line["url"],
+                )
+
+    def iter_posts(
+        self,
+        category: Annotated[str, "Category the subreddit file belongs to."],
+        data_file: Annotated[str, "Subreddit .jsonl file name."],
+        start_date: Annotated[str, "First post date, yyyy-mm-dd."],
+        end_date: Annotated[str, "Last post date, yyyy-mm-dd."],
+    ) -> Iterator[Dict]:
+        """Yield the posts of one subreddit file between two dates, by date then upvotes (descending)."""
+        self.ensure_synced(category)
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT title, content, url, upvotes, post_date FROM posts
+                WHERE category = ? AND data_file = ? AND post_date BETWEEN ? AND ?
+                ORDER BY post_date, upvotes DESC, line_no
+                """,
+                (category, data_file, start_date, end_date),
+            )
+            for title, content, url, upvotes, post_date in rows:
+                yield {
+                    "title": title,
+                    "content": content,
+                    "url": url,
+                    "upvotes": upvotes,
+                    "posted_date": post_date,
+                }
+
+    def top_posts(
+        self,
+        category: Annotated[str, "Category the subreddit file belongs to."],
+        data_file: Annotated[str, "Subreddit .jsonl file name."],
+        date: Annotated[str, "Post date, yyyy-mm-dd."],
+    ) -> List[Dict]:
+        """Get the posts of one subreddit file on a date, sorted by upvotes (descending)."""
+        return list(self.iter_posts(category, data_file, date, date))
+
+
+_indexes: Dict[str, RedditIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_reddit_index(
+    data_path: Annotated[str, "Path to the reddit data folder."],
+) -> RedditIndex:
+    """Get the shared index of a reddit data folder, stored under the data_cache_dir config value."""
+    data_path = os.path.abspath(data_path)
+    with _indexes_lock:
+        if data_path not in _indexes:
+            path_hash = hashlib.sha1(data_path.encode()).hexdigest()[:12]
+            index_path = os.path.join(
+                get_config()["data_cache_dir"], f"reddit_index_{path_hash}.sqlite"
+            )
+            _indexes[data_path] = RedditIndex(data_path, index_path)
+        return _indexes[data_path]
@@ -1,11 +1,14 @@
 import requests
 import time
-import json
 from datetime import datetime, timedelta
 from contextlib import contextmanager
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Dict, List, Sequence
 import os
 import re
+import heapq
+from collections import defaultdict
+from .reddit_index import get_reddit_index
 
 ticker_to_company = {
     "AAPL": "Apple",
@@ -61,75 +64,157 @@ def fetch_top_from_category(
         "Path to the data folder. Default is 'reddit_data'.",
     ] = "reddit_data",
 ):
-    base_path = data_path
+    return fetch_top_from_category_range(
+        category, date, date, max_limit, query, data_path=data_path
+    )[date]
 
-    all_content = []
 
-    if max_limit < len(os.listdir(os.path.join(base_path, category))):
+def fetch_top_from_category_range(
+    category: Annotated[
+        str, "Category to fetch top post from. Collection of subreddits."
+    ],
+    start_date: Annotated[str, "First date to fetch top posts from, yyyy-mm-dd."],
+    end_date: Annotated[str, "Last date to fetch top posts from, yyyy-mm-dd."],
+    max_limit: Annotated[int, "Maximum number of posts to fetch per day."],
+    query: Annotated[str, "Optional query to search for in the subreddit."] = None,
+    data_path: Annotated[
+        str,
+        "Path to the data folder. Default is 'reddit_data'.",
+    ] = "reddit_data",
+) -> Dict[str, List[Dict]]:
+    """
+    Fetch the top posts of every day in [start_date, end_date] with one pass per subreddit.
+    Each day gets the same posts fetch_top_from_category would return for it.
+    Returns a dict mapping each date (in order) to that day's posts.
+    """
+    base_path = data_path
+    category_dir = os.path.join(base_path, category)
+
+    if max_limit < len(os.listdir(category_dir)):
         raise ValueError(
             "REDDIT FETCHING ERROR: max limit is less than the number of files in the category. Will not be able to fetch any posts"
         )
 
-    limit_per_subreddit = max_limit // len(
-        os.listdir(os.path.join(base_path, category))
-    )
+    limit_per_subreddit = max_limit // len(os.listdir(category_dir))
+
+    index = get_reddit_index(base_path)
+    matcher = get_company_matcher(query) if "company" in category and query else None
 
-    for data_file in os.listdir(os.path.join(base_path, category)):
+    days = []
+    curr_date = datetime.strptime(start_date, "%Y-%m-%d")
+    while curr_date <= datetime.strptime(end_date, "%Y-%m-%d"):
+        days.append(curr_date.strftime("%Y-%m-%d"))
+        curr_date += timedelta(days=1)
+    all_content = {day: [] for day in days}
+
+    for data_file in os.listdir(category_dir):
         # check if data_file is a .jsonl file
         if not data_file.endswith(".jsonl"):
             continue
 
-        all_content_curr_subreddit = []
-
-        with open(os.path.join(base_path, category, data_file), "rb") as f:
-            for i, line in enumerate(f):
-                # skip empty lines
-                if not line.strip():
-                    continue
-
-                parsed_line = json.loads(line)
+        # bounded min-heap of the top posts per day, ties broken by position in the file
+        top_per_day = defaultdict(list)
+        for seq, post in enumerate(
+            index.iter_posts(category, data_file, start_date, end_date)
+        ):
+            if matcher and not matcher.matches(post["title"], post["content"]):
+                continue
+
+            heap = top_per_day[post["posted_date"]]
+            entry = (post["upvotes"], -seq, post)
+            if len(heap) < limit_per_subreddit:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        for day, heap in top_per_day.items():
+            all_content[day].extend(
+                post for _, _, post in sorted(heap, key=lambda x: x[:2], reverse=True)
+            )
 
-                # select only lines that are from the date
-                post_date = datetime.utcfromtimestamp(
-                    parsed_line["created_utc"]
-                ).strftime("%Y-%m-%d")
-                if post_date != date:
-                    continue
-
-                # if is company_news, check that the title or the content has the company's name (query) mentioned
-                if "company" in category and query:
-                    search_terms = []
-                    if "OR" in ticker_to_company[query]:
-                        search_terms = ticker_to_company[query].split(" OR ")
-                    else:
-                        search_terms = [ticker_to_company[query]]
-
-                    search_terms.append(query)
-
-                    found = False
-                    for term in search_terms:
-                        if re.search(
-                            term, parsed_line["title"], re.IGNORECASE
-                        ) or re.search(term, parsed_line["selftext"], re.IGNORECASE):
-                            found = True
-                            break
-
-                    if not found:
-                        continue
+    return all_content
 
-                post = {
-                    "title": parsed_line["title"],
-                    "content": parsed_line["selftext"],
-                    "url": parsed_line["url"],
-                    "upvotes": parsed_line["ups"],
-                    "posted_date": post_date,
-                }
 
-                all_content_curr_subreddit.append(post)
+class CompanyMatcher:
+    """
+    Compiled matcher for the company names and tickers of one or more tickers.
+    All search terms are folded into a single case-insensitive alternation regex
+    so a post is scanned once no matter how many tickers are watched.
+    """
+
+    def __init__(self, tickers: Annotated[Sequence[str], "tickers to match"]):
+        self.tickers = list(tickers)
+        self._ticker_patterns = {
+            ticker: self._compile(self.search_terms(ticker)) for ticker in self.tickers
+        }
+        self._pattern = self._compile(
+            [term for ticker in self.tickers for term in self.search_terms(ticker)]
+        )
 
-        # sort all_content_curr_subreddit by upvote_ratio in descending order
-        all_content_curr_subreddit.sort(key=lambda x: x["upvotes"], reverse=True)
+    @staticmethod
+    def search_terms(ticker: str) -> List[str]:
+        """Company names listed for a ticker in ticker_to_company, plus the ticker itself."""
+        company = ticker_to_company.get(ticker)
+        if company is None:
+            return [ticker]
+        return company.split(" OR ") + [ticker]
+
+    @staticmethod
+    def _compile(terms: List[str]) -> re.Pattern:
+        # terms are regular expressions, as in the original per-term re.search
+        return re.compile("|".join(f"(?:{term})" for term in terms), re.IGNORECASE)
+
+    def matches(self, *texts: str) -> bool:
+        """Whether any of the texts mentions any of the tickers."""
+        return any(self._pattern.search(text) for text in texts)
+
+    def tag(self, *texts: str) -> List[str]:
+        """The tickers mentioned in any of the texts."""
+        if not self.matches(*texts):
+            return []
+        if len(self.tickers) == 1:
+            return list(self.tickers)
+        return [
+            ticker
+            for ticker, pattern in self._ticker_patterns.items()
+            if any(pattern.search(text) for text in texts)
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_company_matcher(ticker: Annotated[str, "ticker symbol of the company"]) -> CompanyMatcher:
+    """Get the compiled matcher of a single ticker, built once per ticker."""
+    return CompanyMatcher([ticker])
+
+
+def tag_company_posts(
+    tickers: Annotated[Sequence[str], "watchlist of tickers"],
+    start_date: Annotated[str, "First post date, yyyy-mm-dd."],
+    end_date: Annotated[str, "Last post date, yyyy-mm-dd."],
+    category: Annotated[
+        str, "Category to scan. Collection of subreddits."
+    ] = "company_news",
+    data_path: Annotated[
+        str,
+        "Path to the data folder. Default is 'reddit_data'.",
+    ] = "reddit_data",
+) -> Dict[str, List[Dict]]:
+    """
+    Scan the posts of a category once and tag them for a whole watchlist.
+    Returns a dict mapping each ticker to the posts that mention it, sorted by date then upvotes.
+    """
+    matcher = CompanyMatcher(tickers)
+    index = get_reddit_index(data_path)
+
+    tagged = {ticker: [] for ticker in tickers}
+    for data_file in sorted(os.listdir(os.path.join(data_path, category))):
+        if not data_file.endswith(".jsonl"):
+            continue
+        for post in index.iter_posts(category, data_file, start_date, end_date):
+            for ticker in matcher.tag(post["title"], post["content"]):
+                tagged[ticker].append(post)
 
-        all_content.extend(all_content_curr_subreddit[:limit_per_subreddit])
+    for posts in tagged.values():
+        posts.sort(key=lambda x: (x["posted_date"], -x["upvotes"]))
 
-    return all_content
+    return tagged
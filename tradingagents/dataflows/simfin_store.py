@@ -0,0 +1,149 @@
+import os
+import threading
+from typing import Annotated, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from .config import get_config
+from .utils import write_feather_atomic
+
+# statement -> (directory under simfin_data_all, file name prefix)
+SIMFIN_STATEMENTS = {
+    "balance_sheet": ("balance_sheet", "balance"),
+    "cash_flow": ("cash_flow", "cashflow"),
+    "income_statements": ("income_statements", "income"),
+}
+
+
+class SimFinStatementTable:
+    """
+    One SimFin statement file sorted by (Ticker, Publish Date), with the row range
+    of every ticker so the latest statement as of a date is an index seek.
+    """
+
+    def __init__(self, df: Annotated[pd.DataFrame, "statement with parsed date columns"]):
+        # stable sort so rows sharing a publish date keep their file order
+        self.df = df.sort_values(["Ticker", "Publish Date"], kind="mergesort")
+        self._publish_dates = self.df["Publish Date"].to_numpy(dtype="datetime64[ns]")
+        self._ticker_rows: Dict[str, Tuple[int, int]] = {
+            ticker: (rows[0], rows[-1] + 1)
+            for ticker, rows in self.df.groupby("Ticker", sort=False).indices.items()
+        }
+
+    def latest(
+        self,
+        ticker: Annotated[str, "ticker symbol"],
+        curr_date: Annotated[pd.Timestamp, "UTC-normalized date to look up the statement as of"],
+    ) -> Optional[pd.Series]:
+        """The most recent statement of a ticker published on or before curr_date, or None."""
+        if ticker not in self._ticker_rows:
+            return None
+        start, stop = self._ticker_rows[ticker]
+        publish_dates = self._publish_dates[start:stop]
+
+        end = np.searchsorted(
+            publish_dates, curr_date.to_datetime64().astype("datetime64[ns]"), side="right"
+        )
+        if end == 0:
+            return None
+        # first row with the latest publish date, like idxmax
+        first = np.searchsorted(publish_dates, publish_dates[end - 1], side="left")
+        return self.df.iloc[start + first]
+
+
+class SimFinStore:
+    """
+    Serves SimFin statements from memory. Each statement CSV is parsed once into a
+    Feather file under the cache directory with pre-parsed dates, and only
+    re-converted when the CSV changes.
+    """
+
+    def __init__(
+        self,
+        data_dir: Annotated[str, "directory where the SimFin data is stored"],
+        cache_dir: Annotated[str, "directory where the converted Feather files are stored"],
+    ):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir
+        self._tables: Dict[Tuple[str, str], SimFinStatementTable] = {}
+        self._lock = threading.Lock()
+
+    def csv_path(self, statement: str, freq: str) -> str:
+        directory, prefix = SIMFIN_STATEMENTS[statement]
+        return os.path.join(
+            self.data_dir,
+            "fundamental_data",
+            "simfin_data_all",
+            directory,
+            "companies",
+            "us",
+            f"us-{prefix}-{freq}.csv",
+        )
+
+    def get_table(
+        self,
+        statement: Annotated[str, "balance_sheet, cash_flow or income_statements"],
+        freq: Annotated[str, "reporting frequency: annual / quarterly"],
+    ) -> SimFinStatementTable:
+        key = (statement, freq)
+        with self._lock:
+            if key not in self._tables:
+                self._tables[key] = SimFinStatementTable(self._load(statement, freq))
+            return self._tables[key]
+
+    def latest(
+        self,
+        statement: Annotated[str, "balance_sheet, cash_flow or income_statements"],
+        ticker: Annotated[str, "ticker symbol"],
+        freq: Annotated[str, "reporting frequency: annual / quarterly"],
+        curr_date: Annotated[str, "current date you are trading at, yyyy-mm-dd"],
+    ) -> Optional[pd.Series]:
+        """The most recent statement of a ticker published on or before curr_date, or None."""
+        curr_date_dt = pd.to_datetime(curr_date, utc=True).normalize()
+        return self.get_table(statement, freq).latest(ticker, curr_date_dt)
+
+    def _load(self, statement: str, freq: str) -> pd.DataFrame:
+        csv_path = self.csv_path(statement, freq)
+        csv_mtime = str(os.stat(csv_path).st_mtime).encode()
+        feather_path = os.path.join(
+            self.cache_dir, f"{os.path.basename(csv_path)[:-4]}.feather"
+        )
+
+        if os.path.exists(feather_path):
+            table = feather.read_table(feather_path, memory_map=True)
+            if (table.schema.metadata or {}).get(b"csv_mtime") == csv_mtime:
+                return table.to_pandas()
+
+        df = pd.read_csv(csv_path, sep=";")
+
+        # Convert date strings to datetime objects and remove any time components
+        df["Report Date"] = pd.to_datetime(df["Report Date"], utc=True).dt.normalize()
+        df["Publish Date"] = pd.to_datetime(df["Publish Date"], utc=True).dt.normalize()
+
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), b"csv_mtime": csv_mtime}
+        )
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_feather_atomic(table, feather_path)
+
+        return df
+
+
+_stores: Dict[str, SimFinStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_simfin_store(
+    data_dir: Annotated[str, "directory where the SimFin data is stored"],
+) -> SimFinStore:
+    """Get the shared SimFinStore of a data directory, cached under the data_cache_dir config value."""
+    with _stores_lock:
+        if data_dir not in _stores:
+            _stores[data_dir] = SimFinStore(
+                data_dir, os.path.join(get_config()["data_cache_dir"], "simfin")
+            )
+        return _stores[data_dir]
@@ -1,21 +1,21 @@
 import pandas as pd
-import yfinance as yf
 from stockstats import wrap
-from typing import Annotated
+from typing import Annotated, Dict
+import hashlib
 import os
-from .config import get_config
+from .price_cache import get_price_cache, get_offline_price_frame
+from .price_store import get_price_store
+from .indicator_panel import (
+    PANEL_INDICATORS,
+    load_indicator_panel,
+    price_signature,
+)
 
 
 class StockstatsUtils:
     @staticmethod
-    def get_stock_stats(
+    def load_price_data(
         symbol: Annotated[str, "ticker symbol for the company"],
-        indicator: Annotated[
-            str, "quantitative indicators based off of the stock data for the company"
-        ],
-        curr_date: Annotated[
-            str, "curr date for retrieving stock price data, YYYY-mm-dd"
-        ],
         data_dir: Annotated[
             str,
             "directory where the stock data is stored.",
@@ -24,64 +24,143 @@ class StockstatsUtils:
             bool,
             "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
         ] = False,
-    ):
-        df = None
-        data = None
-
+    ) -> pd.DataFrame:
+        """Load the price history of a symbol with a YYYY-mm-dd "Date" column."""
         if not online:
             try:
-                data = pd.read_csv(
-                    os.path.join(
-                        data_dir,
-                        f"{symbol}-YFin-data-2015-01-01-2025-03-25.csv",
-                    )
-                )
-                df = wrap(data)
+                data = get_offline_price_frame(symbol, data_dir).copy()
             except FileNotFoundError:
                 raise Exception("Stockstats fail: Yahoo Finance data not fetched yet!")
+            data["Date"] = data["Date"].astype(str).str[:10]
         else:
-            # Get today's date as YYYY-mm-dd to add to cache
+            # Get today's date as YYYY-mm-dd to bound the stored history
             today_date = pd.Timestamp.today()
-            curr_date = pd.to_datetime(curr_date)
 
             end_date = today_date
             start_date = today_date - pd.DateOffset(years=15)
             start_date = start_date.strftime("%Y-%m-%d")
             end_date = end_date.strftime("%Y-%m-%d")
 
-            # Get config and ensure cache directory exists
-            config = get_config()
-            os.makedirs(config["data_cache_dir"], exist_ok=True)
+            store = get_price_store()
 
-            data_file = os.path.join(
-                config["data_cache_dir"],
-                f"{symbol}-YFin-data-{start_date}-{end_date}.csv",
-            )
+            def load_online_data():
+                data = store.update(symbol, start_date, end_date)
+                data["Date"] = data["Date"].dt.strftime("%Y-%m-%d")
+                return data
 
-            if os.path.exists(data_file):
-                data = pd.read_csv(data_file)
-                data["Date"] = pd.to_datetime(data["Date"])
-            else:
-                data = yf.download(
+            data = (
+                get_price_cache()
+                .get_or_load(
                     symbol,
-                    start=start_date,
-                    end=end_date,
-                    multi_level_index=False,
-                    progress=False,
-                    auto_adjust=True,
+                    ("yfin-online", store.path(symbol), end_date),
+                    load_online_data,
                 )
-                data = data.reset_index()
-                data.to_csv(data_file, index=False)
+                .copy()
+            )
 
-            df = wrap(data)
-            df["Date"] = df["Date"].dt.strftime("%Y-%m-%d")
-            curr_date = curr_date.strftime("%Y-%m-%d")
+        return data
 
+    @staticmethod
+    def get_indicator_panel(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ) -> pd.DataFrame:
+        """
+        Get the materialized panel of all PANEL_INDICATORS for a symbol. The panel is
+        persisted next to the stored price data and rebuilt when its price history
+        changes (new or corrected bars).
+        """
+        price_data = StockstatsUtils.load_price_data(symbol, data_dir, online)
+        if online:
+            source = "online"
+        else:
+            # offline panels of different data directories must not collide
+            data_dir_hash = hashlib.sha1(
+                os.path.abspath(data_dir).encode()
+            ).hexdigest()[:12]
+            source = f"offline-{data_dir_hash}"
+        panel_path = os.path.join(
+            get_price_store().store_dir,
+            f"{symbol.upper()}-indicators-{source}.feather",
+        )
+        signature = tuple(price_signature(price_data).values())
+
+        return get_price_cache().get_or_load(
+            symbol,
+            ("indicator-panel", panel_path, signature),
+            lambda: load_indicator_panel(price_data, panel_path),
+        )
+
+    @staticmethod
+    def _get_indicator_frame(
+        symbol: str, indicator: str, data_dir: str, online: bool
+    ) -> pd.DataFrame:
+        # supported indicators are sliced from the panel, anything else is computed on the fly
+        if indicator in PANEL_INDICATORS:
+            return StockstatsUtils.get_indicator_panel(symbol, data_dir, online)
+
+        df = wrap(StockstatsUtils.load_price_data(symbol, data_dir, online))
         df[indicator]  # trigger stockstats to calculate the indicator
-        matching_rows = df[df["Date"].str.startswith(curr_date)]
+        return df
+
+    @staticmethod
+    def get_stock_stats(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicator: Annotated[
+            str, "quantitative indicators based off of the stock data for the company"
+        ],
+        curr_date: Annotated[
+            str, "curr date for retrieving stock price data, YYYY-mm-dd"
+        ],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ):
+        df = StockstatsUtils._get_indicator_frame(symbol, indicator, data_dir, online)
+        curr_date = pd.to_datetime(curr_date).strftime("%Y-%m-%d")
+
+        matching_rows = df[df["Date"] == curr_date]
 
         if not matching_rows.empty:
             indicator_value = matching_rows[indicator].values[0]
             return indicator_value
         else:
             return "N/A: Not a trading day (weekend or holiday)"
+
+    @staticmethod
+    def get_stock_stats_window(
+        symbol: Annotated[str, "ticker symbol for the company"],
+        indicator: Annotated[
+            str, "quantitative indicators based off of the stock data for the company"
+        ],
+        start_date: Annotated[str, "start date of the window, YYYY-mm-dd"],
+        end_date: Annotated[str, "end date of the window, YYYY-mm-dd"],
+        data_dir: Annotated[
+            str,
+            "directory where the stock data is stored.",
+        ],
+        online: Annotated[
+            bool,
+            "whether to use online tools to fetch data or offline tools. If True, will use online tools.",
+        ] = False,
+    ) -> Dict[str, float]:
+        """
+        Slice an indicator computed once over the full price history down to a window.
+        Returns a dict mapping each trading date in [start_date, end_date] to its indicator value.
+        """
+        df = StockstatsUtils._get_indicator_frame(symbol, indicator, data_dir, online)
+
+        in_window = (df["Date"] >= start_date) & (df["Date"] <= end_date)
+        return dict(zip(df["Date"][in_window], df[indicator][in_window].values))
@@ -1,6 +1,9 @@
 import os
 import json
+import threading
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
 from datetime import date, timedelta, datetime
 from typing import Annotated
 
@@ -12,6 +15,14 @@ def save_output(data: pd.DataFrame, tag: str, save_path: SavePathType = None) ->
         print(f"{tag} saved to {save_path}")
 
 
+def write_feather_atomic(table: pa.Table, path: str) -> None:
+    """Write an uncompressed Feather file (memory-mappable on read) through a
+    temporary file, so readers never see a partially written file."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
 def get_current_date():
     return date.today().strftime("%Y-%m-%d")
 
@@ -19,15 +19,67 @@ DEFAULT_CONFIG = {
         os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
         "dataflows/data_cache",
     ),
+    # In-memory price-frame cache budget shared by the market data functions
+    "price_cache_max_bytes": 512 * 1024 * 1024,
     # LLM settings
     "llm_provider": "google",
     "deep_think_llm": "gemini-2.5-pro",
     "quick_think_llm": "gemini-2.5-pro",
     "backend_url": "https://generativelanguage.googleapis.com/v1",
+    # LLM response cache: None (off), "record", "replay" or "read_through",
+    # stored in llm_cache_path (None uses llm_cache.sqlite under data_cache_dir)
+    "llm_cache_mode": None,
+    "llm_cache_path": None,
+    # Texts per embeddings request and embeddings requests in flight at once
+    "embedding_batch_size": 64,
+    "embedding_concurrency": 4,
+    # Embeddings kept in the memo shared by the memories of a graph
+    "embedding_memo_size": 256,
+    # Offline hashing embeddings used when the backend has no embeddings endpoint:
+    # vector dimension and longest word n-gram hashed
+    "hash_embedding_dim": 384,
+    "hash_embedding_ngrams": 2,
+    # Vector index of the agent memories: "chroma" or "numpy" (in-process matrix,
+    # faster for the few thousand situations a memory holds)
+    "memory_backend": "chroma",
+    # Keep the agent memories on disk across runs, under memory_dir
+    # (None uses memory under results_dir)
+    "memory_persist": False,
+    "memory_dir": None,
+    # Retention of the agent memories: keep at most memory_max_size situations
+    # (None keeps all), evicting the oldest ("age") or least retrieved ("usefulness");
+    # bounded by default so a long backtest does not grow the index without limit
+    "memory_max_size": 1000,
+    "memory_eviction": "age",
+    # A new situation at least this cosine-similar to a stored one replaces it
+    # (None never merges)
+    "memory_merge_threshold": None,
+    # Evict and record retrieval counts every this many add_situations calls
+    "memory_compact_every": 10,
     # Debate and discussion settings
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
+    # Token budget of the debate history in each role's prompt, e.g.
+    # {"bull": 3000, "bear": 3000, "risky": 3000, "safe": 3000, "neutral": 3000,
+    #  "research_manager": 6000, "risk_manager": 6000}; None (or a missing role)
+    # keeps the full history. Over budget, the latest context_recent_turns turns
+    # are kept verbatim and older turns shrink to their first
+    # context_summary_sentences sentences or are dropped
+    "context_budgets": None,
+    "context_recent_turns": 3,
+    "context_summary_sentences": 2,
     "max_recur_limit": 100,
+    # Run the analysts concurrently instead of one after another
+    "parallel_analysts": False,
+    # Number of (ticker, date) jobs the batch runner propagates at once
+    "batch_max_concurrency": 8,
+    # Backtest settings: worker processes, trading days each decision is held,
+    # and dates per (ticker, date block) shard (None keeps a ticker in one shard)
+    "backtest_max_workers": 4,
+    "backtest_holding_days": 1,
+    "backtest_dates_per_shard": None,
     # Tool settings
     "online_tools": True,
+    # Maximum number of tool calls executed concurrently across the analysts
+    "max_tool_workers": 8,
 }
@@ -6,6 +6,10 @@ from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .tool_node import ConcurrentToolNode
+from .batch import BatchRunner
+from .backtest import Backtester
+from .llm_cache import LLMReplayCache, LLMCacheMiss
 
 __all__ = [
     "TradingAgentsGraph",
@@ -14,4 +18,9 @@ __all__ = [
     "Propagator",
     "Reflector",
     "SignalProcessor",
+    "ConcurrentToolNode",
+    "BatchRunner",
+    "Backtester",
+    "LLMReplayCache",
+    "LLMCacheMiss",
 ]
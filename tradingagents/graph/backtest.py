@@ -0,0 +1,322 @@
+# TradingAgents/graph/backtest.py
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.default_config import DEFAULT_CONFIG
+from tradingagents.dataflows.config import set_config
+from tradingagents.dataflows.price_cache import write_offline_snapshot
+from tradingagents.dataflows.stockstats_utils import StockstatsUtils
+
+from .trading_graph import TradingAgentsGraph
+
+# position taken for each extracted decision
+DECISION_POSITIONS = {"BUY": 1, "SELL": -1, "HOLD": 0}
+
+# graph of the worker process, built once by _init_worker
+_worker_graph: Optional[TradingAgentsGraph] = None
+
+
+def decision_position(decision: str) -> int:
+    """Position (1 long, -1 short, 0 flat) for a decision returned by process_signal."""
+    decision = str(decision).upper()
+    for label in ["SELL", "BUY", "HOLD"]:
+        if label in decision:
+            return DECISION_POSITIONS[label]
+    return 0
+
+
+def realized_returns(
+    prices: pd.DataFrame, trade_dates: Sequence[str], holding_days: int
+) -> pd.DataFrame:
+    """
+    Realized return of a position opened at the close of each trade date (or the
+    next trading day) and closed holding_days trading days later.
+    Dates whose exit is beyond the price history (all of them when there is no
+    price history) get a NaN return.
+    """
+    bar_dates = prices["Date"].to_numpy()
+    closes = prices["Close"].to_numpy(dtype=float)
+    if len(bar_dates) == 0:
+        return pd.DataFrame(
+            {
+                "trade_date": list(trade_dates),
+                "entry_date": [None] * len(trade_dates),
+                "exit_date": [None] * len(trade_dates),
+                "entry_price": np.nan,
+                "exit_price": np.nan,
+                "realized_return": np.nan,
+            }
+        )
+
+    entry = np.searchsorted(bar_dates, np.asarray(trade_dates), side="left")
+    exit_ = entry + holding_days
+    realized = exit_ < len(bar_dates)
+
+    entry_idx = np.minimum(entry, len(bar_dates) - 1)
+    exit_idx = np.minimum(exit_, len(bar_dates) - 1)
+    return pd.DataFrame(
+        {
+            "trade_date": list(trade_dates),
+            "entry_date": np.where(realized, bar_dates[entry_idx], None),
+            "exit_date": np.where(realized, bar_dates[exit_idx], None),
+            "entry_price": np.where(realized, closes[entry_idx], np.nan),
+            "exit_price": np.where(realized, closes[exit_idx], np.nan),
+            "realized_return": np.where(
+                realized, closes[exit_idx] / closes[entry_idx] - 1, np.nan
+            ),
+        }
+    )
+
+
+def equity_curve(
+    decisions: pd.DataFrame, prices: Dict[str, pd.DataFrame]
+) -> pd.DataFrame:
+    """
+    Equity curve over the price bars, from the decisions with a realized return.
+    Each decision holds its position from the bar after its entry to its exit
+    bar, and a bar's return is the mean return of the positions open on it, so
+    overlapping holding periods share the capital instead of compounding on top
+    of each other.
+    """
+    bar_pnl = []
+    for ticker, group in decisions.dropna(subset=["pnl"]).groupby("ticker"):
+        bar_dates = prices[ticker]["Date"].to_numpy()
+        closes = prices[ticker]["Close"].to_numpy(dtype=float)
+        entry = np.searchsorted(bar_dates, group["entry_date"].to_numpy())
+        exit_ = np.searchsorted(bar_dates, group["exit_date"].to_numpy())
+
+        bars = np.concatenate(
+            [np.arange(start + 1, end + 1) for start, end in zip(entry, exit_)]
+        )
+        positions = np.repeat(group["position"].to_numpy(), exit_ - entry)
+        bar_pnl.append(
+            pd.DataFrame(
+                {
+                    "date": bar_dates[bars],
+                    "pnl": positions * (closes[bars] / closes[bars - 1] - 1),
+                }
+            )
+        )
+
+    if not bar_pnl:
+        return pd.DataFrame(columns=["date", "pnl", "equity"])
+    pnl = pd.concat(bar_pnl).groupby("date")["pnl"].mean()
+    return pd.DataFrame(
+        {"date": pnl.index, "pnl": pnl.values, "equity": (1 + pnl).cumprod().values}
+    )
+
+
+def _init_worker(config: Dict[str, Any], selected_analysts: List[str]) -> None:
+    global _worker_graph
+    _worker_graph = TradingAgentsGraph(selected_analysts, config=config)
+
+
+def _run_shard(
+    ticker: str,
+    trade_dates: List[str],
+    outcomes: Dict[str, Tuple[str, float]],
+) -> List[Dict[str, Any]]:
+    """
+    Propagate one ticker over a contiguous block of dates in date order.
+    outcomes maps each trade date with a realized return to (exit date, return).
+    A decision is only reflected on once its exit date has been reached, so the
+    memories used on a date never contain outcomes from its future. A failed
+    reflection is recorded on the row of the date it reflects on.
+    """
+    graph = _worker_graph
+
+    # every shard starts from empty memories, a worker may have run later dates before
+    for memory in [
+        graph.bull_memory,
+        graph.bear_memory,
+        graph.trader_memory,
+        graph.invest_judge_memory,
+        graph.risk_manager_memory,
+    ]:
+        memory.clear()
+
+    records = []
+    # (exit date, record, final state, position return) in trade date order
+    pending = []
+    for trade_date in trade_dates:
+        while pending and pending[0][0] <= trade_date:
+            _, record, final_state, returns_losses = pending.pop(0)
+            try:
+                graph.reflect_and_remember(returns_losses, final_state)
+            except Exception as e:
+                record["status"] = "reflection_error"
+                record["error"] = repr(e)
+
+        try:
+            final_state, decision = graph.propagate(ticker, trade_date)
+        except Exception as e:
+            records.append(
+                {
+                    "ticker": ticker,
+                    "trade_date": trade_date,
+                    "decision": "",
+                    "status": "error",
+                    "error": repr(e),
+                }
+            )
+            continue
+
+        record = {
+            "ticker": ticker,
+            "trade_date": trade_date,
+            "decision": decision,
+            "status": "ok",
+            "error": "",
+        }
+        records.append(record)
+        if trade_date in outcomes:
+            exit_date, realized_return = outcomes[trade_date]
+            pending.append(
+                (
+                    exit_date,
+                    record,
+                    final_state,
+                    decision_position(decision) * realized_return,
+                )
+            )
+
+    return records
+
+
+class Backtester:
+    """
+    Replays propagate and reflect_and_remember over historical trade dates.
+
+    Dates are sharded by (ticker, contiguous date block) across worker processes,
+    each holding its own TradingAgentsGraph. Price histories are loaded once up
+    front into Feather files: with online tools the price store, and offline a
+    snapshot of each CSV. The workers memory-map those instead of downloading or
+    parsing the CSVs again, so the pages are shared through the OS page cache.
+    Realized returns, per-decision P&L and the equity curve are
+    computed from those same price histories.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any] = None,
+        selected_analysts=["market", "social", "news", "fundamentals"],
+        max_workers: Optional[int] = None,
+        holding_days: Optional[int] = None,
+        dates_per_shard: Optional[int] = None,
+    ):
+        """Initialize with the graph configuration and the backtest settings.
+
+        Args:
+            config: TradingAgentsGraph configuration, defaults to DEFAULT_CONFIG
+            selected_analysts: analysts of every worker's graph
+            max_workers: number of worker processes (backtest_max_workers)
+            holding_days: trading days each decision is held (backtest_holding_days)
+            dates_per_shard: dates per shard, None keeps every ticker in one
+                shard so its memories carry over all dates (backtest_dates_per_shard)
+        """
+        self.config = config or DEFAULT_CONFIG
+        self.selected_analysts = selected_analysts
+        self.max_workers = max_workers or self.config["backtest_max_workers"]
+        self.holding_days = holding_days or self.config["backtest_holding_days"]
+        self.dates_per_shard = (
+            dates_per_shard or self.config["backtest_dates_per_shard"]
+        )
+        self.results_dir = os.path.join(self.config["results_dir"], "backtest")
+
+        # the parent loads prices through the same cache locations as the workers
+        set_config(self.config)
+
+    def load_prices(self, tickers: Sequence[str]) -> Dict[str, pd.DataFrame]:
+        """Load the price history of every ticker once, before the workers start."""
+        price_dir = os.path.join(self.config["data_dir"], "market_data", "price_data")
+        prices = {}
+        for ticker in tickers:
+            if not self.config["online_tools"]:
+                write_offline_snapshot(ticker, price_dir)
+            prices[ticker] = StockstatsUtils.load_price_data(
+                ticker, price_dir, online=self.config["online_tools"]
+            )
+        return prices
+
+    def shards(
+        self, tickers: Sequence[str], trade_dates: Sequence[str]
+    ) -> List[Tuple[str, List[str]]]:
+        """Split the dates of every ticker into contiguous blocks."""
+        block = self.dates_per_shard or len(trade_dates)
+        return [
+            (ticker, list(trade_dates[start : start + block]))
+            for ticker in tickers
+            for start in range(0, len(trade_dates), block)
+        ]
+
+    def run(
+        self, tickers: Sequence[str], trade_dates: Sequence[str]
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Backtest the tickers over the trade dates (YYYY-mm-dd).
+
+        Returns the per-decision table (decision, position, realized return and
+        P&L of every ticker and date) and the equity curve over the price bars
+        (see equity_curve).
+        Both are also written to results_dir/backtest.
+        """
+        trade_dates = sorted(str(trade_date) for trade_date in trade_dates)
+
+        prices = self.load_prices(tickers)
+        returns = pd.concat(
+            [
+                realized_returns(
+                    ticker_prices, trade_dates, self.holding_days
+                ).assign(ticker=ticker)
+                for ticker, ticker_prices in prices.items()
+            ],
+            ignore_index=True,
+        )
+        outcomes = {
+            ticker: {
+                row.trade_date: (row.exit_date, row.realized_return)
+                for row in group.itertuples()
+                if not math.isnan(row.realized_return)
+            }
+            for ticker, group in returns.groupby("ticker")
+        }
+
+        records = []
+        # spawn, the workers build their graphs from scratch rather than inheriting threads
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            # shards start from empty memories, which must not wipe the persistent ones
+            initargs=({**self.config, "memory_persist": False}, self.selected_analysts),
+        ) as pool:
+            futures = [
+                pool.submit(_run_shard, ticker, dates, outcomes[ticker])
+                for ticker, dates in self.shards(tickers, trade_dates)
+            ]
+            for future in as_completed(futures):
+                records.extend(future.result())
+
+        decisions = pd.DataFrame(
+            records, columns=["ticker", "trade_date", "decision", "status", "error"]
+        ).merge(returns, on=["ticker", "trade_date"], how="left")
+        decisions["position"] = decisions["decision"].map(decision_position)
+        decisions["pnl"] = decisions["position"] * decisions["realized_return"]
+        decisions = decisions.sort_values(["ticker", "trade_date"]).reset_index(
+            drop=True
+        )
+
+        curve = equity_curve(decisions, prices)
+
+        os.makedirs(self.results_dir, exist_ok=True)
+        decisions.to_csv(os.path.join(self.results_dir, "decisions.csv"), index=False)
+        curve.to_csv(os.path.join(self.results_dir, "equity_curve.csv"), index=False)
+
+        return decisions, curve
@@ -0,0 +1,114 @@
+# TradingAgents/graph/batch.py
+
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from .trading_graph import TradingAgentsGraph
+
+RESULT_COLUMNS = [
+    "ticker",
+    "trade_date",
+    "decision",
+    "status",
+    "error",
+    "elapsed_seconds",
+]
+
+
+class BatchRunner:
+    """
+    Runs one TradingAgentsGraph over many (ticker, trade date) jobs with bounded
+    concurrency. All jobs share the graph's LLM clients and memories and the
+    process-wide data caches, and results are streamed as the jobs complete.
+    """
+
+    def __init__(
+        self,
+        graph: TradingAgentsGraph,
+        max_concurrency: Optional[int] = None,
+        results_path: Optional[str] = None,
+    ):
+        """Initialize with the graph to run, the number of concurrent jobs and the results table path."""
+        self.graph = graph
+        self.max_concurrency = (
+            max_concurrency or graph.config["batch_max_concurrency"]
+        )
+        self.results_path = results_path or os.path.join(
+            graph.config["results_dir"], "batch_results.csv"
+        )
+
+    async def arun(
+        self, jobs: Iterable[Tuple[str, str]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the jobs and yield one result per job in completion order.
+
+        Each result holds the RESULT_COLUMNS fields and the final graph state
+        under "final_state" (None if the job failed).
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_job(ticker, trade_date):
+            async with semaphore:
+                start = time.perf_counter()
+                result = {"ticker": ticker, "trade_date": str(trade_date)}
+                try:
+                    final_state, decision = await self.graph.apropagate(
+                        ticker, trade_date
+                    )
+                    result.update(
+                        decision=decision,
+                        status="ok",
+                        error="",
+                        final_state=final_state,
+                    )
+                except Exception as e:
+                    result.update(
+                        decision="", status="error", error=repr(e), final_state=None
+                    )
+                result["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+                return result
+
+        tasks = [
+            asyncio.create_task(run_job(ticker, trade_date))
+            for ticker, trade_date in jobs
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # stop the remaining jobs if the consumer gives up early
+            for task in tasks:
+                task.cancel()
+
+    async def arun_table(
+        self,
+        jobs: Iterable[Tuple[str, str]],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> pd.DataFrame:
+        """Run the jobs, calling on_result as each completes, and write the consolidated results table."""
+        rows = []
+        async for result in self.arun(jobs):
+            if on_result is not None:
+                on_result(result)
+            rows.append({column: result[column] for column in RESULT_COLUMNS})
+
+        table = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+        table = table.sort_values(["ticker", "trade_date"], kind="mergesort")
+        table = table.reset_index(drop=True)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.results_path)), exist_ok=True)
+        table.to_csv(self.results_path, index=False)
+        return table
+
+    def run(
+        self,
+        jobs: Iterable[Tuple[str, str]],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> pd.DataFrame:
+        """Blocking version of arun_table."""
+        return asyncio.run(self.arun_table(jobs, on_result))
@@ -0,0 +1,189 @@
+# TradingAgents/graph/llm_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+# record: always call the LLM and store the responses
+# replay: only serve stored responses, a miss raises LLMCacheMiss
+# read_through: serve stored responses and call the LLM on a miss
+LLM_CACHE_MODES = ["record", "replay", "read_through"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    llm_string TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    generations TEXT NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+
+# message fields that are not sent to the model but differ between a live and a
+# replayed response (e.g. replayed responses carry a zero total_cost)
+_UNSENT_MESSAGE_FIELDS = ["response_metadata", "usage_metadata"]
+
+
+def _normalize_prompt(prompt: str) -> str:
+    """Drop the unsent fields from the serialized prompt messages."""
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+
+    for message in messages:
+        kwargs = message.get("kwargs") if isinstance(message, dict) else None
+        if isinstance(kwargs, dict):
+            for field in _UNSENT_MESSAGE_FIELDS:
+                kwargs.pop(field, None)
+    return json.dumps(messages, sort_keys=True)
+
+
+class LLMCacheMiss(Exception):
+    """Raised in replay mode when a call has no recorded response."""
+
+
+class LLMReplayCache(BaseCache):
+    """
+    Persistent SQLite cache of LLM responses for deterministic re-runs.
+
+    Entries are keyed by the model and its parameters (including bound tools) and
+    the prompt messages, as handed over by the chat models. Pass it as cache= to
+    ChatOpenAI, ChatAnthropic or ChatGoogleGenerativeAI.
+    """
+
+    def __init__(self, path: str, mode: str = "read_through"):
+        """Initialize with the SQLite file and one of LLM_CACHE_MODES."""
+        if mode not in LLM_CACHE_MODES:
+            raise ValueError(
+                f"Unknown LLM cache mode {mode!r}, expected one of {LLM_CACHE_MODES}"
+            )
+        self.path = path
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            # concurrent readers, e.g. backtest workers replaying the same file
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(
+            f"{llm_string}\x00{_normalize_prompt(prompt)}".encode()
+        ).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        """Get the recorded response of a call, or None to let the LLM run."""
+        if self.mode == "record":
+            return None
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT generations FROM llm_responses WHERE key = ?",
+                (self._key(prompt, llm_string),),
+            ).fetchone()
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if row is not None:
+            return self._loads(row[0])
+        if self.mode == "replay":
+            raise LLMCacheMiss(
+                f"No recorded LLM response in {self.path} for this call, record it first"
+            )
+        return None
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: Sequence[Generation]
+    ) -> None:
+        """Record the response of a call."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?)",
+                (
+                    self._key(prompt, llm_string),
+                    llm_string,
+                    prompt,
+                    self._dumps(return_val),
+                    time.time(),
+                ),
+            )
+
+    def clear(self, **kwargs: Any) -> None:
+        """Drop all recorded responses."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_responses")
+
+    @staticmethod
+    def _dumps(generations: Sequence[Generation]) -> str:
+        return json.dumps(
+            [
+                {
+                    "message": message_to_dict(generation.message)
+                    if isinstance(generation, ChatGeneration)
+                    else None,
+                    "text": generation.text,
+                    "generation_info": generation.generation_info,
+                }
+                for generation in generations
+            ],
+            default=str,
+        )
+
+    @staticmethod
+    def _loads(data: str) -> Sequence[Generation]:
+        generations = []
+        for entry in json.loads(data):
+            if entry["message"] is None:
+                generations.append(
+                    Generation(
+                        text=entry["text"], generation_info=entry["generation_info"]
+                    )
+                )
+            else:
+                generations.append(
+                    ChatGeneration(
+                        message=messages_from_dict([entry["message"]])[0],
+                        generation_info=entry["generation_info"],
+                    )
+                )
+        return generations
+
+
+def create_llm_cache(config) -> Optional[LLMReplayCache]:
+    """Build the LLM cache described by the llm_cache_* config values, or None when disabled."""
+    if not config.get("llm_cache_mode"):
+        return None
+    path = config.get("llm_cache_path") or os.path.join(
+        config["data_cache_dir"], "llm_cache.sqlite"
+    )
+    return LLMReplayCache(path, config["llm_cache_mode"])
@@ -1,8 +1,24 @@
 # TradingAgents/graph/reflection.py
 
+import asyncio
 from typing import Dict, Any
 from langchain_openai import ChatOpenAI
 
+# memory key -> (component label, part of the final state reflected on)
+REFLECTION_COMPONENTS = {
+    "bull": ("BULL", lambda state: state["investment_debate_state"]["bull_history"]),
+    "bear": ("BEAR", lambda state: state["investment_debate_state"]["bear_history"]),
+    "trader": ("TRADER", lambda state: state["trader_investment_plan"]),
+    "invest_judge": (
+        "INVEST JUDGE",
+        lambda state: state["investment_debate_state"]["judge_decision"],
+    ),
+    "risk_manager": (
+        "RISK JUDGE",
+        lambda state: state["risk_debate_state"]["judge_decision"],
+    ),
+}
+
 
 class Reflector:
     """Handles reflection on decisions and updating memory."""
@@ -55,11 +71,8 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
 
         return f"{curr_market_report}\n\n{curr_sentiment_report}\n\n{curr_news_report}\n\n{curr_fundamentals_report}"
 
-    def _reflect_on_component(
-        self, component_type: str, report: str, situation: str, returns_losses
-    ) -> str:
-        """Generate reflection for a component."""
-        messages = [
+    def _reflection_messages(self, report: str, situation: str, returns_losses):
+        return [
             ("system", self.reflection_system_prompt),
             (
                 "human",
@@ -67,9 +80,50 @@ Adhere strictly to these instructions, and ensure your output is detailed, accur
             ),
         ]
 
+    def _reflect_on_component(
+        self, component_type: str, report: str, situation: str, returns_losses
+    ) -> str:
+        """Generate reflection for a component."""
+        messages = self._reflection_messages(report, situation, returns_losses)
+
         result = self.quick_thinking_llm.invoke(messages).content
         return result
 
+    def reflect_all(self, current_state, returns_losses, memories: Dict[str, Any]):
+        """
+        Reflect on every component at once and update their memories.
+        memories maps REFLECTION_COMPONENTS keys to the memory of that component.
+        The reflection LLM calls run concurrently, and the memories are only
+        written once all of them have returned.
+        """
+        situation = self._extract_current_situation(current_state)
+        responses = self.quick_thinking_llm.batch(
+            self._component_messages(current_state, situation, returns_losses, memories)
+        )
+        self._remember(situation, responses, memories)
+
+    async def areflect_all(
+        self, current_state, returns_losses, memories: Dict[str, Any]
+    ):
+        """Async version of reflect_all."""
+        situation = self._extract_current_situation(current_state)
+        responses = await self.quick_thinking_llm.abatch(
+            self._component_messages(current_state, situation, returns_losses, memories)
+        )
+        await asyncio.to_thread(self._remember, situation, responses, memories)
+
+    def _component_messages(self, current_state, situation, returns_losses, memories):
+        return [
+            self._reflection_messages(
+                REFLECTION_COMPONENTS[key][1](current_state), situation, returns_losses
+            )
+            for key in memories
+        ]
+
+    def _remember(self, situation, responses, memories):
+        for memory, response in zip(memories.values(), responses):
+            memory.add_situations([(situation, response.content)])
+
     def reflect_bull_researcher(self, current_state, returns_losses, bull_memory):
         """Reflect on bull researcher's analysis and update memory."""
         situation = self._extract_current_situation(current_state)
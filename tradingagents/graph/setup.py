@@ -2,14 +2,16 @@
 
 from typing import Dict, Any
 from langchain_openai import ChatOpenAI
+from langchain_core.runnables import Runnable, RunnableLambda
 from langgraph.graph import END, StateGraph, START
-from langgraph.prebuilt import ToolNode
 
 from tradingagents.agents import *
 from tradingagents.agents.utils.agent_states import AgentState
 from tradingagents.agents.utils.agent_utils import Toolkit
+from tradingagents.agents.utils.context_builder import ContextBuilder
 
 from .conditional_logic import ConditionalLogic
+from .tool_node import ConcurrentToolNode
 
 
 class GraphSetup:
@@ -20,13 +22,14 @@ class GraphSetup:
         quick_thinking_llm: ChatOpenAI,
         deep_thinking_llm: ChatOpenAI,
         toolkit: Toolkit,
-        tool_nodes: Dict[str, ToolNode],
+        tool_nodes: Dict[str, ConcurrentToolNode],
         bull_memory,
         bear_memory,
         trader_memory,
         invest_judge_memory,
         risk_manager_memory,
         conditional_logic: ConditionalLogic,
+        context_builder: ContextBuilder = None,
     ):
         """Initialize with required components."""
         self.quick_thinking_llm = quick_thinking_llm
@@ -39,9 +42,12 @@ class GraphSetup:
         self.invest_judge_memory = invest_judge_memory
         self.risk_manager_memory = risk_manager_memory
         self.conditional_logic = conditional_logic
+        self.context_builder = context_builder
 
     def setup_graph(
-        self, selected_analysts=["market", "social", "news", "fundamentals"]
+        self,
+        selected_analysts=["market", "social", "news", "fundamentals"],
+        parallel_analysts=False,
     ):
         """Set up and compile the agent workflow graph.
 
@@ -51,6 +57,8 @@ class GraphSetup:
                 - "social": Social media analyst
                 - "news": News analyst
                 - "fundamentals": Fundamentals analyst
+            parallel_analysts (bool): Run the analysts concurrently, each on its own
+                message channel, instead of one after another
         """
         if len(selected_analysts) == 0:
             raise ValueError("Trading Agents Graph Setup Error: no analysts selected!")
@@ -90,22 +98,28 @@ class GraphSetup:
 
         # Create researcher and manager nodes
         bull_researcher_node = create_bull_researcher(
-            self.quick_thinking_llm, self.bull_memory
+            self.quick_thinking_llm, self.bull_memory, self.context_builder
         )
         bear_researcher_node = create_bear_researcher(
-            self.quick_thinking_llm, self.bear_memory
+            self.quick_thinking_llm, self.bear_memory, self.context_builder
         )
         research_manager_node = create_research_manager(
-            self.deep_thinking_llm, self.invest_judge_memory
+            self.deep_thinking_llm, self.invest_judge_memory, self.context_builder
         )
         trader_node = create_trader(self.quick_thinking_llm, self.trader_memory)
 
         # Create risk analysis nodes
-        risky_analyst = create_risky_debator(self.quick_thinking_llm)
-        neutral_analyst = create_neutral_debator(self.quick_thinking_llm)
-        safe_analyst = create_safe_debator(self.quick_thinking_llm)
+        risky_analyst = create_risky_debator(
+            self.quick_thinking_llm, self.context_builder
+        )
+        neutral_analyst = create_neutral_debator(
+            self.quick_thinking_llm, self.context_builder
+        )
+        safe_analyst = create_safe_debator(
+            self.quick_thinking_llm, self.context_builder
+        )
         risk_manager_node = create_risk_manager(
-            self.deep_thinking_llm, self.risk_manager_memory
+            self.deep_thinking_llm, self.risk_manager_memory, self.context_builder
         )
 
         # Create workflow
@@ -113,11 +127,20 @@ class GraphSetup:
 
         # Add analyst nodes to the graph
         for analyst_type, node in analyst_nodes.items():
-            workflow.add_node(f"{analyst_type.capitalize()} Analyst", node)
-            workflow.add_node(
-                f"Msg Clear {analyst_type.capitalize()}", delete_nodes[analyst_type]
-            )
-            workflow.add_node(f"tools_{analyst_type}", tool_nodes[analyst_type])
+            if parallel_analysts:
+                # each analyst keeps its tool loop on its own message channel
+                channel = f"{analyst_type}_messages"
+                analyst_node = _on_message_channel(node, channel)
+                delete_node = _on_message_channel(delete_nodes[analyst_type], channel)
+                tool_node = tool_nodes[analyst_type].with_messages_key(channel)
+            else:
+                analyst_node = node
+                delete_node = delete_nodes[analyst_type]
+                tool_node = tool_nodes[analyst_type]
+
+            workflow.add_node(f"{analyst_type.capitalize()} Analyst", analyst_node)
+            workflow.add_node(f"Msg Clear {analyst_type.capitalize()}", delete_node)
+            workflow.add_node(f"tools_{analyst_type}", tool_node)
 
         # Add other nodes
         workflow.add_node("Bull Researcher", bull_researcher_node)
@@ -130,24 +153,40 @@ class GraphSetup:
         workflow.add_node("Risk Judge", risk_manager_node)
 
         # Define edges
-        # Start with the first analyst
-        first_analyst = selected_analysts[0]
-        workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
+        if parallel_analysts:
+            # Fan out from the start to every analyst and join before the researchers
+            for analyst_type in selected_analysts:
+                workflow.add_edge(START, f"{analyst_type.capitalize()} Analyst")
+        else:
+            # Start with the first analyst
+            first_analyst = selected_analysts[0]
+            workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
 
-        # Connect analysts in sequence
+        # Connect analysts to their tools
         for i, analyst_type in enumerate(selected_analysts):
             current_analyst = f"{analyst_type.capitalize()} Analyst"
             current_tools = f"tools_{analyst_type}"
             current_clear = f"Msg Clear {analyst_type.capitalize()}"
 
+            should_continue = getattr(
+                self.conditional_logic, f"should_continue_{analyst_type}"
+            )
+            if parallel_analysts:
+                should_continue = _on_message_channel(
+                    should_continue, f"{analyst_type}_messages"
+                )
+
             # Add conditional edges for current analyst
             workflow.add_conditional_edges(
                 current_analyst,
-                getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
+                should_continue,
                 [current_tools, current_clear],
             )
             workflow.add_edge(current_tools, current_analyst)
 
+            if parallel_analysts:
+                continue
+
             # Connect to next analyst or to Bull Researcher if this is the last analyst
             if i < len(selected_analysts) - 1:
                 next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
@@ -155,6 +194,16 @@ class GraphSetup:
             else:
                 workflow.add_edge(current_clear, "Bull Researcher")
 
+        if parallel_analysts:
+            # Bull Researcher waits until every analyst has finished
+            workflow.add_edge(
+                [
+                    f"Msg Clear {analyst_type.capitalize()}"
+                    for analyst_type in selected_analysts
+                ],
+                "Bull Researcher",
+            )
+
         # Add remaining edges
         workflow.add_conditional_edges(
             "Bull Researcher",
@@ -203,3 +252,28 @@ class GraphSetup:
 
         # Compile and return
         return workflow.compile()
+
+
+def _on_message_channel(func, channel):
+    """Run a node or router that works on "messages" against another message channel."""
+
+    def to_channel(state):
+        return {**state, "messages": state[channel]}
+
+    def from_channel(result):
+        if isinstance(result, dict) and "messages" in result:
+            result = {**result}
+            result[channel] = result.pop("messages")
+        return result
+
+    if not isinstance(func, Runnable):
+        return lambda state: from_channel(func(to_channel(state)))
+
+    async def achannel_func(state):
+        return from_channel(await func.ainvoke(to_channel(state)))
+
+    return RunnableLambda(
+        lambda state: from_channel(func.invoke(to_channel(state))),
+        afunc=achannel_func,
+        name=func.get_name(),
+    )
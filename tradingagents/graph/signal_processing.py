@@ -1,7 +1,63 @@
 # TradingAgents/graph/signal_processing.py
 
+import re
+import threading
+from typing import Optional
+
 from langchain_openai import ChatOpenAI
 
+# a decision word on its own, not the "BUY/HOLD/SELL" template placeholder
+_DECISION = r"(?<![/\w])(BUY|SELL|HOLD)(?![/\w])"
+
+# the marker the agents are prompted to end with; the last one is the final call
+_PROPOSAL_PATTERN = re.compile(
+    r"FINAL\s+TRANSACTION\s+PROPOSAL\s*:?\s*[*_`\"']*\s*" + _DECISION, re.IGNORECASE
+)
+
+# verdict phrasings: "Recommendation: BUY", "we recommend a hold", ...
+_VERDICT_PATTERNS = [
+    re.compile(
+        r"\b(?:final\s+)?(?:recommendation|decision|verdict|rating|action)\s*(?:is)?\s*[:\-]?\s*[*_`\"']*\s*"
+        + _DECISION,
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"\b(?:I|we)\s+(?:strongly\s+|firmly\s+)?(?:recommend|advise|suggest)\s+(?:to\s+|a\s+)?[*_`\"']*\s*"
+        + _DECISION,
+        re.IGNORECASE,
+    ),
+]
+
+# any mention of a decision, e.g. an option weighed after the verdict
+_MENTION_PATTERN = re.compile(_DECISION, re.IGNORECASE)
+
+
+def parse_decision(full_signal: str) -> Optional[str]:
+    """
+    Extract BUY, SELL or HOLD from a trading signal without an LLM.
+    Returns None when the text has no clear decision.
+
+    Without a FINAL TRANSACTION PROPOSAL marker, a verdict phrasing only decides
+    when it is the only one in the text and no decision is mentioned after it.
+    """
+    proposals = _PROPOSAL_PATTERN.findall(full_signal)
+    if proposals:
+        return proposals[-1].upper()
+
+    verdicts = {
+        match.span(): match
+        for pattern in _VERDICT_PATTERNS
+        for match in pattern.finditer(full_signal)
+    }
+    if len(verdicts) != 1:
+        # none, or several verdicts to weigh: leave it to the LLM
+        return None
+
+    (verdict,) = verdicts.values()
+    if _MENTION_PATTERN.search(full_signal, verdict.end()):
+        return None
+    return verdict.group(1).upper()
+
 
 class SignalProcessor:
     """Processes trading signals to extract actionable decisions."""
@@ -9,10 +65,21 @@ class SignalProcessor:
     def __init__(self, quick_thinking_llm: ChatOpenAI):
         """Initialize with an LLM for processing."""
         self.quick_thinking_llm = quick_thinking_llm
+        self.fast_path_count = 0
+        self.fallback_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def fallback_rate(self) -> float:
+        """Share of the processed signals that needed the LLM."""
+        total = self.fast_path_count + self.fallback_count
+        return self.fallback_count / total if total else 0.0
 
     def process_signal(self, full_signal: str) -> str:
         """
         Process a full trading signal to extract the core decision.
+        The decision is parsed from the text when it is unambiguous, and only
+        extracted by the LLM otherwise.
 
         Args:
             full_signal: Complete trading signal text
@@ -20,12 +87,33 @@ class SignalProcessor:
         Returns:
             Extracted decision (BUY, SELL, or HOLD)
         """
-        messages = [
+        decision = self._fast_path(full_signal)
+        if decision is not None:
+            return decision
+        return self.quick_thinking_llm.invoke(self._messages(full_signal)).content
+
+    async def aprocess_signal(self, full_signal: str) -> str:
+        """Async version of process_signal, awaiting the LLM instead of blocking."""
+        decision = self._fast_path(full_signal)
+        if decision is not None:
+            return decision
+        response = await self.quick_thinking_llm.ainvoke(self._messages(full_signal))
+        return response.content
+
+    def _fast_path(self, full_signal: str) -> Optional[str]:
+        decision = parse_decision(full_signal)
+        with self._lock:
+            if decision is None:
+                self.fallback_count += 1
+            else:
+                self.fast_path_count += 1
+        return decision
+
+    def _messages(self, full_signal: str):
+        return [
             (
                 "system",
                 "You are an efficient assistant designed to analyze paragraphs or financial reports provided by a group of analysts. Your task is to extract the investment decision: SELL, BUY, or HOLD. Provide only the extracted decision (SELL, BUY, or HOLD) as your output, without adding any additional text or information.",
             ),
             ("human", full_signal),
         ]
-
-        return self.quick_thinking_llm.invoke(messages).content
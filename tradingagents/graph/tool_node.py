@@ -0,0 +1,80 @@
+# TradingAgents/graph/tool_node.py
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import BaseTool
+
+
+class ConcurrentToolNode(RunnableLambda):
+    """
+    Graph node that executes the tool calls of the last AI message concurrently.
+    The blocking dataflow functions behind the tools run in a bounded thread pool,
+    which can be shared between nodes, and the tool messages come back in call order.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        max_workers: int = 8,
+        messages_key: str = "messages",
+        executor: Optional[Executor] = None,
+    ):
+        """Initialize with the tools, the worker limit and the message channel to read from."""
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.max_workers = max_workers
+        self.messages_key = messages_key
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tools"
+        )
+        super().__init__(self._run, afunc=self._arun, name="tools")
+
+    def with_messages_key(self, messages_key: str) -> "ConcurrentToolNode":
+        """Same tools and thread pool, working on another message channel."""
+        return ConcurrentToolNode(
+            list(self.tools_by_name.values()),
+            self.max_workers,
+            messages_key=messages_key,
+            executor=self.executor,
+        )
+
+    def _run_one(self, tool_call: Dict[str, Any]) -> ToolMessage:
+        """Execute a single tool call, turning failures into an error message for the LLM."""
+        tool = self.tools_by_name.get(tool_call["name"])
+        if tool is None:
+            return ToolMessage(
+                content=f"Error: {tool_call['name']} is not a valid tool, try one of [{', '.join(self.tools_by_name)}].",
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"],
+                status="error",
+            )
+
+        try:
+            return tool.invoke({**tool_call, "type": "tool_call"})
+        except Exception as e:
+            return ToolMessage(
+                content=f"Error: {e!r}\n Please fix your mistakes.",
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"],
+                status="error",
+            )
+
+    def _submit(self, tool_call: Dict[str, Any]):
+        # carry the callbacks and tracing context over to the worker thread
+        return self.executor.submit(copy_context().run, self._run_one, tool_call)
+
+    def _run(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        tool_calls = state[self.messages_key][-1].tool_calls
+        futures = [self._submit(tool_call) for tool_call in tool_calls]
+        return {self.messages_key: [future.result() for future in futures]}
+
+    async def _arun(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        tool_calls = state[self.messages_key][-1].tool_calls
+        outputs = await asyncio.gather(
+            *(asyncio.wrap_future(self._submit(tool_call)) for tool_call in tool_calls)
+        )
+        return {self.messages_key: list(outputs)}
@@ -1,6 +1,8 @@
 # TradingAgents/graph/trading_graph.py
 
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import json
 from datetime import date
@@ -10,11 +12,10 @@ from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 
-from langgraph.prebuilt import ToolNode
-
 from tradingagents.agents import *
 from tradingagents.default_config import DEFAULT_CONFIG
-from tradingagents.agents.utils.memory import FinancialSituationMemory
+from tradingagents.agents.utils.memory import EmbeddingMemo, FinancialSituationMemory
+from tradingagents.agents.utils.context_builder import ContextBuilder
 from tradingagents.agents.utils.agent_states import (
     AgentState,
     InvestDebateState,
@@ -27,6 +28,8 @@ from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .tool_node import ConcurrentToolNode
+from .llm_cache import create_llm_cache
 
 
 class TradingAgentsGraph:
@@ -57,33 +60,39 @@ class TradingAgentsGraph:
             exist_ok=True,
         )
 
-        # Initialize LLMs
+        # Initialize LLMs, replaying recorded responses if the LLM cache is enabled
+        self.llm_cache = create_llm_cache(self.config)
         if self.config["llm_provider"].lower() == "openai" or self.config["llm_provider"] == "ollama" or self.config["llm_provider"] == "openrouter":
-            self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
-            self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
+            self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"], cache=self.llm_cache)
+            self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"], cache=self.llm_cache)
         elif self.config["llm_provider"].lower() == "anthropic":
-            self.deep_thinking_llm = ChatAnthropic(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
-            self.quick_thinking_llm = ChatAnthropic(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
+            self.deep_thinking_llm = ChatAnthropic(model=self.config["deep_think_llm"], base_url=self.config["backend_url"], cache=self.llm_cache)
+            self.quick_thinking_llm = ChatAnthropic(model=self.config["quick_think_llm"], base_url=self.config["backend_url"], cache=self.llm_cache)
         elif self.config["llm_provider"].lower() == "google":
-            self.deep_thinking_llm = ChatGoogleGenerativeAI(model=self.config["deep_think_llm"])
-            self.quick_thinking_llm = ChatGoogleGenerativeAI(model=self.config["quick_think_llm"])
+            self.deep_thinking_llm = ChatGoogleGenerativeAI(model=self.config["deep_think_llm"], cache=self.llm_cache)
+            self.quick_thinking_llm = ChatGoogleGenerativeAI(model=self.config["quick_think_llm"], cache=self.llm_cache)
         else:
             raise ValueError(f"Unsupported LLM provider: {self.config['llm_provider']}")
         
         self.toolkit = Toolkit(config=self.config)
 
         # Initialize memories
-        self.bull_memory = FinancialSituationMemory("bull_memory", self.config)
-        self.bear_memory = FinancialSituationMemory("bear_memory", self.config)
-        self.trader_memory = FinancialSituationMemory("trader_memory", self.config)
-        self.invest_judge_memory = FinancialSituationMemory("invest_judge_memory", self.config)
-        self.risk_manager_memory = FinancialSituationMemory("risk_manager_memory", self.config)
+        # the memories share one embedding memo, they are queried with the same situation
+        self.embedding_memo = EmbeddingMemo(self.config["embedding_memo_size"])
+        self.bull_memory = FinancialSituationMemory("bull_memory", self.config, self.embedding_memo)
+        self.bear_memory = FinancialSituationMemory("bear_memory", self.config, self.embedding_memo)
+        self.trader_memory = FinancialSituationMemory("trader_memory", self.config, self.embedding_memo)
+        self.invest_judge_memory = FinancialSituationMemory("invest_judge_memory", self.config, self.embedding_memo)
+        self.risk_manager_memory = FinancialSituationMemory("risk_manager_memory", self.config, self.embedding_memo)
 
         # Create tool nodes
         self.tool_nodes = self._create_tool_nodes()
 
         # Initialize components
-        self.conditional_logic = ConditionalLogic()
+        self.conditional_logic = ConditionalLogic(
+            max_debate_rounds=self.config["max_debate_rounds"],
+            max_risk_discuss_rounds=self.config["max_risk_discuss_rounds"],
+        )
         self.graph_setup = GraphSetup(
             self.quick_thinking_llm,
             self.deep_thinking_llm,
@@ -95,6 +104,11 @@ class TradingAgentsGraph:
             self.invest_judge_memory,
             self.risk_manager_memory,
             self.conditional_logic,
+            ContextBuilder(
+                budgets=self.config["context_budgets"],
+                recent_turns=self.config["context_recent_turns"],
+                summary_sentences=self.config["context_summary_sentences"],
+            ),
         )
 
         self.propagator = Propagator()
@@ -104,15 +118,22 @@ class TradingAgentsGraph:
         # State tracking
         self.curr_state = None
         self.ticker = None
-        self.log_states_dict = {}  # date to full state dict
+        self.log_states_dict = {}  # ticker to date to full state dict
 
         # Set up the graph
-        self.graph = self.graph_setup.setup_graph(selected_analysts)
+        self.graph = self.graph_setup.setup_graph(
+            selected_analysts, parallel_analysts=self.config["parallel_analysts"]
+        )
 
-    def _create_tool_nodes(self) -> Dict[str, ToolNode]:
+    def _create_tool_nodes(self) -> Dict[str, ConcurrentToolNode]:
         """Create tool nodes for different data sources."""
+        # one bounded pool for the blocking dataflow calls of all analysts, shut
+        # down by close()
+        self.tool_executor = ThreadPoolExecutor(
+            max_workers=self.config["max_tool_workers"], thread_name_prefix="tools"
+        )
         return {
-            "market": ToolNode(
+            "market": ConcurrentToolNode(
                 [
                     # online tools
                     self.toolkit.get_YFin_data_online,
@@ -120,17 +141,21 @@ class TradingAgentsGraph:
                     # offline tools
                     self.toolkit.get_YFin_data,
                     self.toolkit.get_stockstats_indicators_report,
-                ]
+                ],
+                self.config["max_tool_workers"],
+                executor=self.tool_executor,
             ),
-            "social": ToolNode(
+            "social": ConcurrentToolNode(
                 [
                     # online tools
                     self.toolkit.get_stock_news_openai,
                     # offline tools
                     self.toolkit.get_reddit_stock_info,
-                ]
+                ],
+                self.config["max_tool_workers"],
+                executor=self.tool_executor,
             ),
-            "news": ToolNode(
+            "news": ConcurrentToolNode(
                 [
                     # online tools
                     self.toolkit.get_global_news_openai,
@@ -138,9 +163,11 @@ class TradingAgentsGraph:
                     # offline tools
                     self.toolkit.get_finnhub_news,
                     self.toolkit.get_reddit_news,
-                ]
+                ],
+                self.config["max_tool_workers"],
+                executor=self.tool_executor,
             ),
-            "fundamentals": ToolNode(
+            "fundamentals": ConcurrentToolNode(
                 [
                     # online tools
                     self.toolkit.get_fundamentals_openai,
@@ -150,10 +177,28 @@ class TradingAgentsGraph:
                     self.toolkit.get_simfin_balance_sheet,
                     self.toolkit.get_simfin_cashflow,
                     self.toolkit.get_simfin_income_stmt,
-                ]
+                ],
+                self.config["max_tool_workers"],
+                executor=self.tool_executor,
             ),
         }
 
+    def close(self):
+        """Shut down the tool thread pool. The graph cannot propagate afterwards."""
+        self.tool_executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        # graphs that are never closed still release their pool's threads
+        executor = getattr(self, "tool_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
     def propagate(self, company_name, trade_date):
         """Run the trading agents graph for a company on a specific date."""
 
@@ -184,14 +229,57 @@ class TradingAgentsGraph:
         self.curr_state = final_state
 
         # Log state
-        self._log_state(trade_date, final_state)
+        self._log_state(company_name, trade_date, final_state)
 
         # Return decision and processed signal
         return final_state, self.process_signal(final_state["final_trade_decision"])
 
-    def _log_state(self, trade_date, final_state):
+    async def apropagate(self, company_name, trade_date):
+        """
+        Async version of propagate. The LLM calls are awaited and the blocking data
+        and memory lookups run in worker threads, so one event loop can drive many
+        analyses at once. curr_state is left to the run that finished last, use the
+        returned state to reflect on a specific run.
+        """
+
+        # Initialize state
+        init_agent_state = self.propagator.create_initial_state(
+            company_name, trade_date
+        )
+        args = self.propagator.get_graph_args()
+
+        if self.debug:
+            # Debug mode with tracing
+            trace = []
+            async for chunk in self.graph.astream(init_agent_state, **args):
+                if len(chunk["messages"]) == 0:
+                    pass
+                else:
+                    chunk["messages"][-1].pretty_print()
+                    trace.append(chunk)
+
+            final_state = trace[-1]
+        else:
+            # Standard mode without tracing
+            final_state = await self.graph.ainvoke(init_agent_state, **args)
+
+        self.ticker = company_name
+        self.curr_state = final_state
+
+        # Log state
+        await asyncio.to_thread(
+            self._log_state, company_name, trade_date, final_state
+        )
+
+        # Return decision and processed signal
+        return final_state, await self.aprocess_signal(
+            final_state["final_trade_decision"]
+        )
+
+    def _log_state(self, ticker, trade_date, final_state):
         """Log the final state to a JSON file."""
-        self.log_states_dict[str(trade_date)] = {
+        ticker_log = self.log_states_dict.setdefault(ticker, {})
+        ticker_log[str(trade_date)] = {
             "company_of_interest": final_state["company_of_interest"],
             "trade_date": final_state["trade_date"],
             "market_report": final_state["market_report"],
@@ -222,33 +310,51 @@ class TradingAgentsGraph:
         }
 
         # Save to file
-        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
+        directory = Path(f"eval_results/{ticker}/TradingAgentsStrategy_logs/")
         directory.mkdir(parents=True, exist_ok=True)
 
         with open(
-            f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log_{trade_date}.json",
+            f"eval_results/{ticker}/TradingAgentsStrategy_logs/full_states_log_{trade_date}.json",
             "w",
         ) as f:
-            json.dump(self.log_states_dict, f, indent=4)
+            # copy, concurrent runs of the ticker may be adding dates
+            json.dump(dict(ticker_log), f, indent=4)
 
-    def reflect_and_remember(self, returns_losses):
-        """Reflect on decisions and update memory based on returns."""
-        self.reflector.reflect_bull_researcher(
-            self.curr_state, returns_losses, self.bull_memory
-        )
-        self.reflector.reflect_bear_researcher(
-            self.curr_state, returns_losses, self.bear_memory
-        )
-        self.reflector.reflect_trader(
-            self.curr_state, returns_losses, self.trader_memory
-        )
-        self.reflector.reflect_invest_judge(
-            self.curr_state, returns_losses, self.invest_judge_memory
+    def reflect_and_remember(self, returns_losses, final_state=None):
+        """Reflect on decisions and update memory based on returns.
+
+        final_state defaults to the state of the last propagate call.
+        """
+        if final_state is None:
+            final_state = self.curr_state
+
+        self.reflector.reflect_all(
+            final_state, returns_losses, self._reflection_memories()
         )
-        self.reflector.reflect_risk_manager(
-            self.curr_state, returns_losses, self.risk_manager_memory
+
+    async def areflect_and_remember(self, returns_losses, final_state=None):
+        """Async version of reflect_and_remember."""
+        if final_state is None:
+            final_state = self.curr_state
+
+        await self.reflector.areflect_all(
+            final_state, returns_losses, self._reflection_memories()
         )
 
+    def _reflection_memories(self):
+        """Memory of each reflected component, keyed like REFLECTION_COMPONENTS."""
+        return {
+            "bull": self.bull_memory,
+            "bear": self.bear_memory,
+            "trader": self.trader_memory,
+            "invest_judge": self.invest_judge_memory,
+            "risk_manager": self.risk_manager_memory,
+        }
+
     def process_signal(self, full_signal):
         """Process a signal to extract the core decision."""
         return self.signal_processor.process_signal(full_signal)
+
+    async def aprocess_signal(self, full_signal):
+        """Async version of process_signal."""
+        return await self.signal_processor.aprocess_signal(full_signal)